@@ -18,11 +18,15 @@
 # -- Imports --------------------------------------------------------------------------
 
 from random import randrange
-from .morph import analyze
+from .morph import analyze, analyze_chunk
+from .corpus import iter_sentence_chunks
 from .responder import RandomResponder, PatternResponder, TemplateResponder, MarkovResponder
 from .responder import KeywordResponder, SpecialResponder, UserRandomResponder
 from .dictionary import Dictionary
-from typing import Union, Iterable
+from .watcher import DictionaryWatcher
+from .profiling import DialogueProfiler
+from .replication import Broker, Replicator
+from typing import Union, Iterable, List, Callable, Optional
 from pathlib import Path
 from traceback import print_exc
 
@@ -55,6 +59,7 @@ class MocaBot(object):
 
         self.__name = name
         self.__responder = self.__responders['pattern']
+        self.__profiler: Optional[DialogueProfiler] = None
 
     def dialogue(self, message: str, study: bool = False) -> str:
         """
@@ -62,8 +67,10 @@ class MocaBot(object):
         呼び出されるたびにランダムでResponderを切り替える。
         入力をDictionaryに学習させる。
         studyパラメータまたはauto_study設定がオンになっている場合のみ学習する。
+        一回の応答では最初に取得した辞書だけを使うため、Responderを切り替えても同じ版の辞書で応答する。
         """
         parts = analyze(message)
+        snapshot = self.__dictionary.snapshot
         limit = 3
         while True:
             chance = randrange(0, 100)
@@ -77,7 +84,7 @@ class MocaBot(object):
                 self.__responder = self.__responders['pattern']
             else:
                 self.__responder = self.__responders['markov']
-            response = self.__responder.response(message, parts)
+            response = self.__responder.response(message, parts, snapshot)
             if response:
                 break
             else:
@@ -89,37 +96,38 @@ class MocaBot(object):
         self.__dictionary.save()
 
     def study(self, message: Union[str, Iterable[str]]):
-        """メッセージを学習する。"""
+        """
+        メッセージを学習する。学習済みのメッセージは形態素解析も行わない。
+        学習した内容は呼び出しごとには公開せず、Dictionary.COMMIT_DELAY秒以内にまとめて公開する。
+        """
         if isinstance(message, str):
-            self.__dictionary.study(message, analyze(message))
+            if not self.__dictionary.is_learned(message):
+                self.__dictionary.study(message, analyze(message))
         else:
             for item in message:
-                self.__dictionary.study(item, analyze(item))
+                if not self.__dictionary.is_learned(item):
+                    self.__dictionary.study(item, analyze(item))
+        self.__dictionary.commit(Dictionary.COMMIT_DELAY)
 
     def study_from_file(self,
                         filename: Union[Path, str],
                         print_log: bool = False) -> bool:
+        """
+        ファイルfilenameの文章を学習する。
+        テキストファイルのほか、gzip/bz2/xzで圧縮されたファイル、
+        JSONLのツイートやTwitterのアーカイブ(tweets.js)を読み込める。
+        ファイルは少しずつ読み込むため、ファイルの大きさに関わらずメモリ使用量は一定となる。
+        """
         try:
-            with open(str(filename), mode='r', encoding='utf-8') as file:
-                count = 0
-                for line in file:
-                    for message in line.split():
-                        if len(message) < 3:
-                            pass
-                        elif message.startswith('#'):
-                            pass
-                        elif message.startswith('@'):
-                            pass
-                        elif message.startswith('http'):
-                            pass
-                        elif message[0] in '0123456789':
-                            pass
-                        else:
-                            parts = analyze(message)
-                            self.__dictionary.study(message, parts)
-                            count += 1
-                            if print_log:
-                                print(message)
+            count = 0
+            for messages in iter_sentence_chunks(filename):
+                messages = [message for message in messages if not self.__dictionary.is_learned(message)]
+                for message, parts in zip(messages, analyze_chunk(messages)):
+                    # 同じチャンクの中で重複している文は学習されないため数えない
+                    if self.__dictionary.study(message, parts):
+                        count += 1
+                        if print_log:
+                            print(message)
             self.save()
             if print_log:
                 print(f'{count}件のテキストを学習しました。')
@@ -127,6 +135,70 @@ class MocaBot(object):
         except Exception:
             print_exc()
 
+    def reload(self) -> List[str]:
+        """更新された辞書ファイルを読み込み直し、読み込み直した辞書の種類を返す。"""
+        return DictionaryWatcher(self.__dictionary).check()
+
+    def watcher(self,
+                interval: float = 5.0,
+                print_log: bool = False,
+                callback: Optional[Callable[[List[str]], None]] = None) -> DictionaryWatcher:
+        """辞書ファイルを監視するDictionaryWatcherを返す。監視はrun()で開始する。"""
+        return DictionaryWatcher(self.__dictionary, interval, print_log, callback)
+
+    def replicate(self,
+                  broker: Broker,
+                  channel: Optional[str] = None,
+                  instance_id: Optional[str] = None,
+                  callback: Optional[Callable[[int], None]] = None) -> Replicator:
+        """
+        学習した文をbrokerで他のインスタンスと共有するReplicatorを作成し、開始する。
+        channelを省略した場合は'moca_bot:<name>'とする。
+        他のインスタンスから受け取った文を辞書ファイルに保存した後にcallbackを呼び出す。
+        """
+        replicator = Replicator(self.__dictionary,
+                                broker,
+                                channel or f'moca_bot:{self.__name}',
+                                instance_id,
+                                callback=callback)
+        replicator.start()
+        return replicator
+
+    def profile(self,
+                dialogues: int = 0,
+                seconds: float = 0.0,
+                mode: str = 'deterministic',
+                callback: Optional[Callable[[DialogueProfiler], None]] = None) -> DialogueProfiler:
+        """
+        次のdialogues回の応答、またはseconds秒間の応答をプロファイルする。
+        modeは'deterministic'(cProfile)または'sampling'。
+        計測中だけdialogueを計測用の関数に差し替えるため、計測していない時の負荷は無い。
+        結果はprofiles/に書き込まれ、終了時にcallbackが呼び出される。
+        """
+        if self.__profiler is not None and self.__profiler.running:
+            raise RuntimeError('profiling is already running.')
+
+        def finish(profiler: DialogueProfiler) -> None:
+            # インスタンスに設定した計測用の関数を削除し、クラスのdialogueに戻す
+            # 結果の書き込み中に次の計測が始まっている場合があるため、自身の関数の場合のみ削除する
+            try:
+                if getattr(self.__dict__.get('dialogue'), '__self__', None) is profiler:
+                    del self.__dict__['dialogue']
+            finally:
+                if callback is not None:
+                    callback(profiler)
+
+        profiler = DialogueProfiler(MocaBot.dialogue.__get__(self),
+                                    Path(__file__).parent.parent.joinpath('profiles'),
+                                    dialogues,
+                                    seconds,
+                                    mode,
+                                    callback=finish)
+        self.__profiler = profiler
+        self.dialogue = profiler.wrapper
+        profiler.start()
+        return profiler
+
     @property
     def name(self) -> str:
         """人工無脳インスタンスの名前"""
@@ -0,0 +1,112 @@
+# Ω*
+#               ■          ■■■■■  
+#               ■         ■■   ■■ 
+#               ■        ■■     ■ 
+#               ■        ■■       
+#     ■■■■■     ■        ■■■      
+#    ■■   ■■    ■         ■■■     
+#   ■■     ■■   ■          ■■■■   
+#   ■■     ■■   ■            ■■■■ 
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■ 
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import List, Optional, Tuple
+from .markov import Markov
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- Compact --------------------------------------------------------------------------
+
+
+def compact_file(source: Path,
+                 output: Optional[Path] = None,
+                 threshold: int = 1,
+                 samples: int = 5,
+                 dry_run: bool = False) -> None:
+    """
+    マルコフ辞書sourceを読み込み、縮小してoutputに書き込む。
+    outputが指定されていない場合はsourceを上書きする。
+    縮小前後のサイズと生成文のサンプルを表示する。
+    """
+    output = source if output is None else output
+    before = Markov()
+    before.load(source)
+    after = Markov()
+    after.load(source)
+    after.compact(threshold)
+
+    print(f'対象ファイル: {source}')
+    _print_size('縮小前', before, source.stat().st_size)
+    if not dry_run:
+        after.save(output)
+        _print_size('縮小後', after, output.stat().st_size)
+    else:
+        _print_size('縮小後', after, None)
+
+    if samples > 0:
+        _print_samples('縮小前', before, samples)
+        _print_samples('縮小後', after, samples)
+
+
+def _print_size(label: str, markov: Markov, file_size: Optional[int]) -> None:
+    """辞書の大きさを表示する。"""
+    prefixes, transitions, total = markov.size()
+    size = '-' if file_size is None else f'{file_size:,} bytes'
+    print(f'{label}: prefix {prefixes:,}件 / 遷移 {transitions:,}件 (延べ {total:,}回) / ファイル {size}')
+
+
+def _print_samples(label: str, markov: Markov, samples: int) -> None:
+    """生成文のサンプルと、生成に失敗した件数、平均文字数を表示する。"""
+    sentences, failures = _generate(markov, samples)
+    average = sum(len(sentence) for sentence in sentences) / len(sentences) if sentences else 0
+    print(f'{label}のサンプル (失敗 {failures}/{samples}件, 平均 {average:.1f}文字):')
+    for sentence in sentences:
+        print(f'    {sentence}')
+
+
+def _generate(markov: Markov, samples: int) -> Tuple[List[str], int]:
+    """文章をsamples回生成し、生成された文章のリストと失敗した回数を返す。"""
+    sentences = []
+    failures = 0
+    for _ in range(samples):
+        try:
+            sentence = markov.generate('')
+        except Exception:
+            sentence = None
+        if sentence:
+            sentences.append(sentence)
+        else:
+            failures += 1
+    return sentences, failures
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = ArgumentParser(description='マルコフ辞書を重複排除・枝刈りして縮小する。')
+    parser.add_argument('name', nargs='?', default='shirotako', help='辞書の名前 (data/<name>/markov.dat)')
+    parser.add_argument('-f', '--file', type=Path, default=None, help='対象のマルコフ辞書ファイル')
+    parser.add_argument('-o', '--output', type=Path, default=None, help='書き込み先 (省略時は上書き)')
+    parser.add_argument('-t', '--threshold', type=int, default=1, help='この回数未満の遷移を削除する')
+    parser.add_argument('-s', '--samples', type=int, default=5, help='表示する生成文のサンプル数')
+    parser.add_argument('-n', '--dry-run', action='store_true', help='ファイルに書き込まない')
+    args = parser.parse_args(argv)
+
+    source = args.file
+    if source is None:
+        source = Path(__file__).parent.parent.joinpath('data').joinpath(args.name).joinpath('markov.dat')
+    compact_file(source, args.output, args.threshold, args.samples, args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
+
+# -------------------------------------------------------------------------- Compact --
@@ -0,0 +1,216 @@
+# Ω*
+#               ■          ■■■■■  
+#               ■         ■■   ■■ 
+#               ■        ■■     ■ 
+#               ■        ■■       
+#     ■■■■■     ■        ■■■      
+#    ■■   ■■    ■         ■■■     
+#   ■■     ■■   ■          ■■■■   
+#   ■■     ■■   ■            ■■■■ 
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■ 
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from bz2 import open as bz2_open
+from gzip import open as gzip_open
+from itertools import islice
+from json import JSONDecoder, JSONDecodeError, loads
+from lzma import open as lzma_open
+from pathlib import Path
+from re import compile
+from typing import Iterator, List, Optional, TextIO, Union
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- Variables --------------------------------------------------------------------------
+
+# 圧縮形式ごとのファイルを開く関数
+OPENERS = {
+    '.gz': gzip_open,
+    '.bz2': bz2_open,
+    '.xz': lzma_open,
+    '.lzma': lzma_open,
+}
+
+# 学習しない語 (空白で区切られた語のうち、ハッシュタグ・メンション・URL)
+NOISE = compile(r'(?<!\S)(?:[#＃@＠]|http)\S*')
+
+# 文 (文末記号または改行までを一つの文とする)
+SENTENCE = compile(r'[^。！？!?\n]+[。！？!?]*')
+
+# 一度に処理するテキストの件数
+CHUNK_SIZE = 256
+
+# ファイルを読み込む単位(文字数)
+READ_SIZE = 1 << 16
+
+# JSON配列の一つの要素の最大の大きさ(文字数)。これを超える要素があるファイルは読み込まない
+MAX_ELEMENT_SIZE = 1 << 20
+
+# JSON配列の要素の終わりを探すときに確認する文字 (文字列中のエスケープは一つの記号として扱う)
+JSON_SYMBOL = compile(r'\\.|["{}\[\],]')
+
+# -------------------------------------------------------------------------- Variables --
+
+# -- Public Functions --------------------------------------------------------------------------
+
+
+def open_text(filename: Union[Path, str]) -> TextIO:
+    """ファイルfilenameを開く。拡張子が.gz, .bz2, .xz, .lzmaの場合は展開しながら読み込む。"""
+    opener = OPENERS.get(Path(filename).suffix.lower(), open)
+    return opener(str(filename), mode='rt', encoding='utf-8')
+
+
+def iter_texts(filename: Union[Path, str]) -> Iterator[str]:
+    """
+    ファイルfilenameからテキストを一件ずつ返す。
+    .jsonlは一行ごとのツイート、.jsと.jsonはTwitterのアーカイブ(tweets.jsなど)として読み込む。
+    それ以外のファイルは一行を一件とする。リツイートとJSONとして正しくない行・要素は学習しない。
+    """
+    path = Path(filename)
+    suffix = path.suffix.lower()
+    if suffix in OPENERS:
+        suffix = Path(path.stem).suffix.lower()
+    with open_text(path) as file:
+        if suffix == '.jsonl':
+            for line in file:
+                if line.strip():
+                    try:
+                        item = loads(line)
+                    except JSONDecodeError:
+                        # JSONとして正しくない行は読み飛ばして次の行から読み込みを続ける
+                        continue
+                    text = tweet_text(item)
+                    if text:
+                        yield text
+        elif suffix in ('.js', '.json'):
+            for item in iter_json_array(file):
+                text = tweet_text(item)
+                if text:
+                    yield text
+        else:
+            yield from file
+
+
+def iter_json_array(file: TextIO) -> Iterator[object]:
+    """
+    ファイルの最初の`[`から始まるJSON配列の要素を一つずつ返す。
+    `window.YTD.tweet.part0 = [...]`のような前置きは読み飛ばす。
+    JSONとして正しくない要素は読み飛ばして次の要素から読み込みを続ける。
+    配列全体をメモリに読み込むことはせず、一つの要素がMAX_ELEMENT_SIZEを超える場合はValueErrorを送出する。
+    """
+    decoder = JSONDecoder()
+    buffer = ''
+    while '[' not in buffer:
+        chunk = file.read(READ_SIZE)
+        if not chunk:
+            return
+        buffer = chunk
+    buffer = buffer[buffer.index('[') + 1:]
+    index = 0
+    eof = False
+    while True:
+        while index < len(buffer) and buffer[index] in ' \t\r\n,':
+            index += 1
+        if index < len(buffer):
+            if buffer[index] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, index)
+                # 数値などはbufferの終わりで切れていても読み込めてしまうため、続きを読み込んでから確定する
+                if end < len(buffer) or eof:
+                    yield item
+                    index = end
+                    continue
+            except JSONDecodeError:
+                end = _element_end(buffer, index)
+                if end is not None:
+                    # 要素は終わっているがJSONとして正しくないため、読み飛ばす
+                    index = end
+                    continue
+                if eof:
+                    return
+                if len(buffer) - index > MAX_ELEMENT_SIZE:
+                    raise ValueError(f'JSON element exceeds {MAX_ELEMENT_SIZE} characters.')
+        elif eof:
+            return
+        # 要素が途中で切れている場合は続きを読み込む。読み込んだ部分はこのときだけ切り詰める
+        chunk = file.read(READ_SIZE)
+        eof = not chunk
+        buffer = buffer[index:] + chunk
+        index = 0
+
+
+def _element_end(buffer: str, index: int) -> Optional[int]:
+    """
+    buffer[index:]から始まるJSON配列の要素の終わり(深さ0の`,`または`]`の位置)を返す。
+    要素がbufferの中で終わっていない場合はNoneを返す。要素がJSONとして正しいかどうかは確認しない。
+    """
+    depth = 0
+    in_string = False
+    for symbol in JSON_SYMBOL.finditer(buffer, index):
+        character = symbol.group()
+        if character[0] == '\\':
+            continue
+        elif character == '"':
+            in_string = not in_string
+        elif in_string:
+            continue
+        elif character in '{[':
+            depth += 1
+        elif character in '}]':
+            if depth == 0:
+                return symbol.start()
+            depth -= 1
+        elif depth == 0:
+            return symbol.start()
+    return None
+
+
+def tweet_text(item: object) -> Optional[str]:
+    """ツイートのオブジェクトから本文を返す。本文が無い場合とリツイートの場合はNoneを返す。"""
+    if isinstance(item, str):
+        text = item
+    elif isinstance(item, dict):
+        tweet = item.get('tweet', item)
+        if not isinstance(tweet, dict) or 'retweeted_status' in tweet:
+            return None
+        text = tweet.get('full_text', tweet.get('text'))
+    else:
+        return None
+    if not isinstance(text, str) or text.startswith('RT @'):
+        return None
+    return text
+
+
+def split_sentences(texts: List[str]) -> List[str]:
+    """
+    テキストのリストtextsから、学習する文のリストを返す。
+    ハッシュタグ・メンション・URLを取り除いてから文に分割し、
+    3文字未満の文と数字から始まる文は除外する。
+    正規表現はtextsをまとめた文字列に対して一度だけ適用する。
+    """
+    joined = NOISE.sub('', '\n'.join(texts))
+    sentences = (sentence.strip() for sentence in SENTENCE.findall(joined))
+    return [sentence for sentence in sentences if len(sentence) >= 3 and sentence[0] not in '0123456789']
+
+
+def iter_sentence_chunks(filename: Union[Path, str], chunk_size: int = CHUNK_SIZE) -> Iterator[List[str]]:
+    """ファイルfilenameを読み込み、chunk_size件のテキストごとに学習する文のリストを返す。"""
+    texts = iter_texts(filename)
+    while True:
+        chunk = list(islice(texts, chunk_size))
+        if not chunk:
+            return
+        sentences = split_sentences(chunk)
+        if sentences:
+            yield sentences
+
+# -------------------------------------------------------------------------- Public Functions --
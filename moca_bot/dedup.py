@@ -0,0 +1,176 @@
+# Ω*
+#               ■          ■■■■■  
+#               ■         ■■   ■■ 
+#               ■        ■■     ■ 
+#               ■        ■■       
+#     ■■■■■     ■        ■■■      
+#    ■■   ■■    ■         ■■■     
+#   ■■     ■■   ■          ■■■■   
+#   ■■     ■■   ■            ■■■■ 
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■ 
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from array import array
+from hashlib import blake2b
+from math import ceil, log
+from pathlib import Path
+from struct import calcsize, pack, unpack
+from typing import Iterable, Union
+from unicodedata import normalize
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- SentenceIndex --------------------------------------------------------------------------
+
+
+class SentenceIndex(object):
+    """
+    学習済みの文を、正規化した文の64bitハッシュで記録する重複判定用の索引。
+    Bloomフィルタで未学習の文をすぐに判定し、学習済みの可能性がある場合は
+    ハッシュ表(オープンアドレス法)で確定する。
+    一件あたりのメモリ使用量は、ハッシュ表が16〜32バイト、Bloomフィルタが1.2〜2.4バイトで一定となる。
+
+    クラス定数:
+    MAGIC -- 保存ファイルの先頭に書き込む識別子
+    HEADER -- 保存ファイルのヘッダーの形式 (識別子, 件数, ハッシュ表の大きさ, Bloomフィルタのビット数, ハッシュ関数の数)
+    ERROR_RATE -- Bloomフィルタの偽陽性率
+    MIN_SIZE -- ハッシュ表の最小の大きさ
+    """
+    MAGIC = b'MOCADDP1'
+    HEADER = '<8sQQQQ'
+    ERROR_RATE = 0.01
+    MIN_SIZE = 1 << 10
+
+    def __init__(self, capacity: int = 0):
+        """capacity件まで拡張せずに記録できる空の索引を作成する。"""
+        size = SentenceIndex.MIN_SIZE
+        while size < capacity * 2:
+            size *= 2
+        self.__count = 0
+        self.__table = array('Q', bytes(8 * size))
+        self.__bloom, self.__bits, self.__hashes = SentenceIndex.__new_bloom(size // 2)
+
+    def add(self, message: str) -> bool:
+        """文messageを記録する。新しい文であればTrue、学習済みであればFalseを返す。"""
+        fingerprint = SentenceIndex.fingerprint(message)
+        if self.__bloom_contains(fingerprint) and self.__find(fingerprint):
+            return False
+        if (self.__count + 1) * 2 > len(self.__table):
+            self.__grow()
+        self.__insert(fingerprint)
+        self.__bloom_add(fingerprint)
+        self.__count += 1
+        return True
+
+    def update(self, messages: Iterable[str]) -> None:
+        """文のリストmessagesをすべて記録する。"""
+        for message in messages:
+            self.add(message)
+
+    def save(self, filename: Union[Path, str]) -> None:
+        """ファイルfilenameへ索引を書き込む。"""
+        with open(str(filename), 'wb') as file:
+            file.write(pack(SentenceIndex.HEADER,
+                            SentenceIndex.MAGIC,
+                            self.__count,
+                            len(self.__table),
+                            self.__bits,
+                            self.__hashes))
+            file.write(self.__table.tobytes())
+            file.write(self.__bloom)
+
+    @staticmethod
+    def load(filename: Union[Path, str]) -> 'SentenceIndex':
+        """ファイルfilenameから索引を読み込む。"""
+        index = SentenceIndex()
+        with open(str(filename), 'rb') as file:
+            magic, count, size, bits, hashes = unpack(SentenceIndex.HEADER,
+                                                      file.read(calcsize(SentenceIndex.HEADER)))
+            if magic != SentenceIndex.MAGIC:
+                raise ValueError(f'{filename} is not a sentence index file.')
+            table = array('Q')
+            table.frombytes(file.read(8 * size))
+            bloom = bytearray(file.read((bits + 7) // 8))
+        index.__count = count
+        index.__table = table
+        index.__bloom = bloom
+        index.__bits = bits
+        index.__hashes = hashes
+        return index
+
+    @staticmethod
+    def normalize(message: str) -> str:
+        """全角・半角と大文字・小文字の違い、連続する空白を無視するように文を正規化する。"""
+        return ' '.join(normalize('NFKC', message).lower().split())
+
+    @staticmethod
+    def fingerprint(message: str) -> int:
+        """正規化した文の64bitハッシュを返す。0は空きを表すため使用しない。"""
+        digest = blake2b(SentenceIndex.normalize(message).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little') or 1
+
+    def __contains__(self, message: str) -> bool:
+        fingerprint = SentenceIndex.fingerprint(message)
+        return self.__bloom_contains(fingerprint) and self.__find(fingerprint)
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __find(self, fingerprint: int) -> bool:
+        table = self.__table
+        mask = len(table) - 1
+        slot = fingerprint & mask
+        while table[slot]:
+            if table[slot] == fingerprint:
+                return True
+            slot = (slot + 1) & mask
+        return False
+
+    def __insert(self, fingerprint: int) -> None:
+        table = self.__table
+        mask = len(table) - 1
+        slot = fingerprint & mask
+        while table[slot]:
+            slot = (slot + 1) & mask
+        table[slot] = fingerprint
+
+    def __grow(self) -> None:
+        """ハッシュ表の大きさを2倍にし、Bloomフィルタを作り直す。"""
+        old = self.__table
+        self.__table = array('Q', bytes(16 * len(old)))
+        self.__bloom, self.__bits, self.__hashes = SentenceIndex.__new_bloom(len(self.__table) // 2)
+        for fingerprint in old:
+            if fingerprint:
+                self.__insert(fingerprint)
+                self.__bloom_add(fingerprint)
+
+    def __positions(self, fingerprint: int):
+        # 64bitハッシュを上下32bitに分け、ダブルハッシュ法でビットの位置を求める
+        low, high = fingerprint & 0xffffffff, (fingerprint >> 32) | 1
+        return ((low + i * high) % self.__bits for i in range(self.__hashes))
+
+    def __bloom_add(self, fingerprint: int) -> None:
+        bloom = self.__bloom
+        for position in self.__positions(fingerprint):
+            bloom[position >> 3] |= 1 << (position & 7)
+
+    def __bloom_contains(self, fingerprint: int) -> bool:
+        bloom = self.__bloom
+        return all(bloom[position >> 3] & (1 << (position & 7)) for position in self.__positions(fingerprint))
+
+    @staticmethod
+    def __new_bloom(capacity: int):
+        """capacity件でERROR_RATEとなるBloomフィルタを、(ビット列, ビット数, ハッシュ関数の数)で返す。"""
+        bits = ceil(-capacity * log(SentenceIndex.ERROR_RATE) / (log(2) ** 2))
+        hashes = max(1, round(bits / capacity * log(2)))
+        return bytearray((bits + 7) // 8), bits, hashes
+
+# -------------------------------------------------------------------------- SentenceIndex --
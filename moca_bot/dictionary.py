@@ -17,161 +17,426 @@
 
 # -- Imports --------------------------------------------------------------------------
 
-from typing import List, Tuple
-from collections import defaultdict
+from typing import List, Tuple, Dict, Optional, NamedTuple, Any, Callable
+from threading import Lock, Timer
 from .markov import Markov
 from .morph import is_keyword
+from .dedup import SentenceIndex
+from .measure import deep_sizeof, distribution
+from heapq import nlargest
 from json import dump, load
 from pathlib import Path
 
 # -------------------------------------------------------------------------- Imports --
 
+# -- DictionarySnapshot --------------------------------------------------------------------------
+
+
+class DictionarySnapshot(NamedTuple):
+    """
+    ある時点の辞書。公開された後は変更しないため、ロックせずに読み込める。
+
+    プロパティ:
+    random -- ランダム辞書
+    pattern -- パターン辞書
+    template -- テンプレート辞書
+    markov -- マルコフ辞書
+    special -- 固定返事
+    keyword -- キーワード辞書
+    user_random -- ユーザー定義ランダム辞書
+    version -- 辞書の版。学習・読み込み直しで新しい辞書を公開するたびに増える
+    """
+    random: List[str]
+    pattern: List[dict]
+    template: Dict[int, List[str]]
+    markov: Markov
+    special: dict
+    keyword: dict
+    user_random: list
+    version: int
+
+# -------------------------------------------------------------------------- DictionarySnapshot --
+
 # -- Dictionary --------------------------------------------------------------------------
 
 
 class Dictionary(object):
     """思考エンジンの辞書クラス。
 
+    応答の生成は公開済みのDictionarySnapshotを読み込むだけで、ロックを取得しない。
+    学習は__pendingにためておき、commit()でまとめて新しいDictionarySnapshotを作成し、差し替える。
+    変更しない部分は前のDictionarySnapshotと共有する。
+    重複の確認に使う集合と索引は公開のたびに作り直さず、__lockを取得して差分だけを更新する。
+
     プロパティ:
     __name -- 辞書の名前
-    __random -- ランダム辞書
-    __pattern -- パターン辞書
-    __template -- テンプレート辞書
-    __markov -- マルコフ辞書
-    __special -- 固定返事
-    __keyword -- キーワード辞書
-    __user_random -- ユーザー定義ランダム辞書
+    __snapshot -- 公開中の辞書
+    __pending -- まだ公開していない学習内容
+    __learned -- 学習済みの文の索引
+    __random_set -- 公開中のランダム辞書の文の集合
+    __pattern_index -- 公開中のパターン辞書の、名詞から位置への索引
+    __timer -- commit(delay)で予約した公開
+    __listeners -- 新しい文を学習したときに呼び出す関数のリスト
+    __lock -- 学習・公開・保存を一度に一つだけ行うためのロック
+    __mtimes -- 読み込み・保存時点での各ファイルの更新時刻
+
+    クラス定数:
+    FILES -- 辞書の種類とファイル名の対応
+    BATCH_SIZE -- 学習内容がこの件数たまったら自動的に公開する
+    COMMIT_DELAY -- MocaBot.study()で学習した内容を公開するまでの最大の待ち時間(秒)
     """
+    FILES = {
+        'random': 'random.txt',
+        'pattern': 'pattern.txt',
+        'template': 'template.txt',
+        'markov': 'markov.dat',
+        'special': 'special.json',
+        'keyword': 'keyword.json',
+        'user_random': 'user_random.json',
+        'learned': 'learned.dat',
+    }
+    BATCH_SIZE = 1024
+    COMMIT_DELAY = 1.0
 
     def __init__(self, name: str):
         """ファイルから辞書の読み込みを行う。"""
         self.__name = name
-        self.__random = self.__load_random()
-        self.__pattern = self.__load_pattern()
-        self.__template = self.__load_template()
-        self.__markov = self.__load_markov()
-        self.__special = self.__load_special()
-        self.__keyword = self.__load_keyword()
-        self.__user_random = self.__load_user_random()
-
-    def study(self, message: str, parts: List[Tuple[str, str]]) -> None:
-        """ランダム辞書、パターン辞書、テンプレート辞書をメモリに保存する。"""
-        self.study_random(message)
-        self.study_pattern(message, parts)
-        self.study_template(parts)
-        self.study_markov(parts)
+        self.__lock = Lock()
+        self.__pending: List[Tuple[str, Optional[str], Optional[List[Tuple[str, str]]]]] = []
+        self.__listeners: List[Callable[[str, List[Tuple[str, str]]], None]] = []
+        self.__timer: Optional[Timer] = None
+        self.__mtimes = self.__get_mtimes()
+        random = self.__load_random()
+        self.__snapshot = DictionarySnapshot(random=random,
+                                             pattern=self.__load_pattern(),
+                                             template=self.__load_template(),
+                                             markov=self.__load_markov(),
+                                             special=self.__load_special(),
+                                             keyword=self.__load_keyword(),
+                                             user_random=self.__load_user_random(),
+                                             version=0)
+        self.__random_set = set(random)
+        self.__pattern_index = Dictionary.index_pattern(self.__snapshot.pattern)
+        self.__learned = self.__load_learned(random)
+
+    def is_learned(self, message: str) -> bool:
+        """messageと同じ文(正規化した文が同じもの)をすでに学習しているかどうかを返す。"""
+        return message in self.__learned
+
+    def add_listener(self, listener: Callable[[str, List[Tuple[str, str]]], None]) -> None:
+        """新しい文を学習したときに、その文と形態素のリストを渡して呼び出す関数listenerを登録する。"""
+        self.__listeners.append(listener)
+
+    def study(self, message: str, parts: List[Tuple[str, str]], notify: bool = True) -> bool:
+        """
+        ランダム辞書、パターン辞書、テンプレート辞書、マルコフ辞書に学習させ、学習したかどうかを返す。
+        すでに学習した文である場合は何もせずにFalseを返す。
+        学習した内容はcommit()を呼ぶか、BATCH_SIZE件たまった時点で公開される。
+        notifyがTrueの場合、add_listener()で登録した関数を呼び出す。
+        """
+        with self.__lock:
+            if not self.__learned.add(message):
+                return False
+            self.__pending.append(('random', message, None))
+            self.__pending.append(('pattern', message, parts))
+            self.__pending.append(('template', None, parts))
+            self.__pending.append(('markov', None, parts))
+            if len(self.__pending) >= Dictionary.BATCH_SIZE:
+                self.__commit()
+        if notify:
+            for listener in self.__listeners:
+                listener(message, parts)
+        return True
 
     def study_markov(self, parts: List[Tuple[str, str]]) -> None:
         """形態素のリストpartsを受け取り、マルコフ辞書に学習させる。"""
-        self.__markov.add_sentence(parts)
+        self.__enqueue('markov', None, parts)
 
     def study_template(self, parts: List[Tuple[str, str]]) -> None:
         """
         形態素のリストpartsを受け取り、
-        名詞のみ'%noun%'に変更した文字列templateをself.__templateに追加する。
+        名詞のみ'%noun%'に変更した文字列templateをテンプレート辞書に追加する。
         名詞が存在しなかった場合、または同じtemplateが存在する場合は何もしない。
         """
-        template = ''
-        count = 0
-        for word, part in parts:
-            if is_keyword(part):
-                word = '%noun%'
-                count += 1
-            template += word
-
-        if count > 0 and template not in self.__template[count]:
-            self.__template[count].append(template)
+        self.__enqueue('template', None, parts)
 
     def study_random(self, message: str) -> None:
         """
         ユーザーの発言をランダム辞書に保存する。
         すでに同じ発言があった場合は何もしない。
         """
-        if message not in self.__random:
-            self.__random.append(message)
+        self.__enqueue('random', message, None)
 
     def study_pattern(self, message: str, parts: List[Tuple[str, str]]) -> None:
         """ユーザーの発言を形態素partsに基づいてパターン辞書に保存する。"""
-        for word, part in parts:
-            if is_keyword(part):  # 品詞が名詞でなければ学習しない
-                # 単語の重複チェック
-                # 同じ単語で登録されていれば、パターンを追加する
-                # 無ければ新しいパターンを作成する
-                duplicated = self.__find_duplicated_pattern(word)
-                if duplicated and message not in duplicated['phrases']:
-                    duplicated['phrases'].append(message)
-                else:
-                    self.__pattern.append({'pattern': word, 'phrases': [message]})
+        self.__enqueue('pattern', message, parts)
+
+    def commit(self, delay: float = 0.0) -> None:
+        """
+        ためておいた学習内容を反映した辞書を公開する。
+        delayが0より大きい場合はすぐには公開せず、delay秒後に一度だけ公開する。
+        その間に呼ばれたcommit(delay)はまとめて公開されるため、少しずつ学習する場合でも公開の回数が抑えられる。
+        """
+        if delay > 0:
+            with self.__lock:
+                if self.__timer is None and self.__pending:
+                    self.__timer = Timer(delay, self.commit)
+                    self.__timer.daemon = True
+                    self.__timer.start()
+            return
+        with self.__lock:
+            self.__commit()
 
     def save(self) -> None:
-        """メモリ上の辞書をファイルに保存する。"""
-        self.__save_random()
-        self.__save_pattern()
-        self.__save_template()
-        self.__markov.save(Path(__file__).parent.parent.joinpath('data').joinpath(self.__name).joinpath('markov.dat'))
-        self.__save_special()
-        self.__save_keyword()
-        self.__save_user_random()
-
-    def __save_template(self):
+        """
+        学習内容を公開してから、公開した辞書をファイルに保存する。
+        保存中も応答の生成は公開済みの辞書で行える。
+        """
+        with self.__lock:
+            self.__commit()
+            snapshot = self.__snapshot
+            self.__save_random(snapshot.random)
+            self.__save_pattern(snapshot.pattern)
+            self.__save_template(snapshot.template)
+            snapshot.markov.save(Path(__file__).parent.parent.joinpath('data').joinpath(self.__name).joinpath('markov.dat'))
+            self.__save_special(snapshot.special)
+            self.__save_keyword(snapshot.keyword)
+            self.__save_user_random(snapshot.user_random)
+            self.__learned.save(Path(__file__).parent.parent.joinpath('data').joinpath(self.__name).joinpath('learned.dat'))
+            # 自分で保存したファイルを再読み込みしないように更新時刻を記録する
+            self.__mtimes = self.__get_mtimes()
+
+    def stats(self, top: int = 10) -> dict:
+        """
+        辞書ごとの要素数と推定メモリ使用量、要素の大きさの分布、フレーズの多い名詞の上位top件、
+        data/<name>/にあるファイルの大きさを返す。
+        公開中のDictionarySnapshotをそのまま読み込んで集計し、辞書を複製しない。
+        """
+        snapshot = self.__snapshot
+        seen = set()
+        heaviest = nlargest(top, snapshot.pattern, key=lambda item: len(item['phrases']))
+        directory = Path(__file__).parent.parent.joinpath('data').joinpath(self.__name)
+        files = {path.name: path.stat().st_size for path in sorted(directory.iterdir()) if path.is_file()} \
+            if directory.is_dir() else {}
+        components = {
+            'random': {
+                'count': len(snapshot.random),
+                'bytes': deep_sizeof(snapshot.random),
+                'length': distribution(len(message) for message in snapshot.random),
+            },
+            'pattern': {
+                'count': len(snapshot.pattern),
+                'bytes': deep_sizeof(snapshot.pattern),
+                'phrases': distribution(len(item['phrases']) for item in snapshot.pattern),
+                'heaviest_nouns': [
+                    {'noun': item['pattern'], 'phrases': len(item['phrases']), 'bytes': deep_sizeof(item)}
+                    for item in heaviest
+                ],
+            },
+            'template': {
+                'count': sum(len(templates) for templates in snapshot.template.values()),
+                'bytes': deep_sizeof(snapshot.template),
+                'by_noun_count': {count: len(templates) for count, templates in sorted(snapshot.template.items())},
+            },
+            'markov': snapshot.markov.stats(top),
+            'special': {'count': len(snapshot.special), 'bytes': deep_sizeof(snapshot.special)},
+            'keyword': {'count': len(snapshot.keyword), 'bytes': deep_sizeof(snapshot.keyword)},
+            'user_random': {'count': len(snapshot.user_random), 'bytes': deep_sizeof(snapshot.user_random)},
+            'learned': {'count': len(self.__learned), 'bytes': deep_sizeof(self.__learned)},
+        }
+        return {
+            'name': self.__name,
+            'version': snapshot.version,
+            'pending': len(self.__pending),
+            # 辞書間で共有している文字列などを重複して数えない合計
+            'bytes': deep_sizeof(snapshot, seen) + deep_sizeof(self.__learned, seen),
+            'components': components,
+            'files': files,
+        }
+
+    def changed(self) -> List[str]:
+        """前回の読み込み・保存以降にファイルが更新された辞書の種類を返す。"""
+        mtimes = self.__get_mtimes()
+        return [component for component, mtime in mtimes.items() if mtime != self.__mtimes.get(component)]
+
+    def reload(self, component: str) -> None:
+        """
+        辞書componentをファイルから読み込み直し、読み込みが終わってから差し替えた辞書を公開する。
+        差し替え前に取得された辞書はそのまま使用できる。
+        メモリ上で学習した内容のうち、公開済みで保存されていないものは破棄される。
+        """
+        mtime = self.__get_mtime(component)
+        value: Any
+        if component == 'random':
+            value = self.__load_random()
+        elif component == 'pattern':
+            value = self.__load_pattern()
+        elif component == 'template':
+            value = self.__load_template()
+        elif component == 'markov':
+            value = self.__load_markov()
+        elif component == 'special':
+            value = self.__load_special()
+        elif component == 'keyword':
+            value = self.__load_keyword()
+        elif component == 'user_random':
+            value = self.__load_user_random()
+        elif component == 'learned':
+            value = self.__load_learned(self.__snapshot.random)
+        else:
+            raise ValueError(f'unknown dictionary component: {component}')
+        with self.__lock:
+            if component == 'learned':
+                self.__learned = value
+            else:
+                if component == 'random':
+                    self.__random_set = set(value)
+                elif component == 'pattern':
+                    self.__pattern_index = Dictionary.index_pattern(value)
+                self.__snapshot = self.__snapshot._replace(**{component: value, 'version': self.__snapshot.version + 1})
+            self.__mtimes = {**self.__mtimes, component: mtime}
+
+    def __enqueue(self, kind: str, message: Optional[str], parts: Optional[List[Tuple[str, str]]]) -> None:
+        """学習内容をためておく。"""
+        with self.__lock:
+            self.__pending.append((kind, message, parts))
+            if len(self.__pending) >= Dictionary.BATCH_SIZE:
+                self.__commit()
+
+    def __commit(self) -> None:
+        """
+        ためておいた学習内容を反映した新しいDictionarySnapshotを作成して公開する。
+        変更する辞書だけを複製し、公開済みの辞書は変更しない。__lockを取得してから呼び出す。
+        """
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        if not self.__pending:
+            return
+        pending, self.__pending = self.__pending, []
+        snapshot = self.__snapshot
+        random = pattern = template = markov = None
+        copied_patterns = copied_templates = None
+        random_set, pattern_index = self.__random_set, self.__pattern_index
+        try:
+            for kind, message, parts in pending:
+                if kind == 'random':
+                    if message not in random_set:
+                        if random is None:
+                            random = list(snapshot.random)
+                        random.append(message)
+                        random_set.add(message)
+                elif kind == 'pattern':
+                    if pattern is None:
+                        pattern = list(snapshot.pattern)
+                        copied_patterns = set()
+                    for word, part in parts:
+                        if is_keyword(part):  # 品詞が名詞でなければ学習しない
+                            # 単語の重複チェック
+                            # 同じ単語で登録されていれば、パターンを追加する
+                            # 無ければ新しいパターンを作成する
+                            index = pattern_index.get(word)
+                            if index is None:
+                                pattern_index[word] = len(pattern)
+                                copied_patterns.add(len(pattern))
+                                pattern.append({'pattern': word, 'phrases': [message]})
+                            elif message not in pattern[index]['phrases']:
+                                if index not in copied_patterns:
+                                    pattern[index] = {'pattern': word, 'phrases': list(pattern[index]['phrases'])}
+                                    copied_patterns.add(index)
+                                pattern[index]['phrases'].append(message)
+                elif kind == 'template':
+                    if template is None:
+                        template = dict(snapshot.template)
+                        copied_templates = set()
+                    text, count = Dictionary.parts2template(parts)
+                    if count > 0 and text not in template.get(count, ()):
+                        if count not in copied_templates:
+                            template[count] = list(template.get(count, ()))
+                            copied_templates.add(count)
+                        template[count].append(text)
+                elif kind == 'markov':
+                    if markov is None:
+                        markov = snapshot.markov.copy()
+                    markov.add_sentence(parts)
+        except Exception:
+            # 途中まで更新した集合と索引を公開中の辞書に合わせて作り直す
+            self.__random_set = set(snapshot.random)
+            self.__pattern_index = Dictionary.index_pattern(snapshot.pattern)
+            raise
+        self.__snapshot = snapshot._replace(random=snapshot.random if random is None else random,
+                                            pattern=snapshot.pattern if pattern is None else pattern,
+                                            template=snapshot.template if template is None else template,
+                                            markov=snapshot.markov if markov is None else markov,
+                                            version=snapshot.version + 1)
+
+    def __get_mtime(self, component: str) -> Optional[int]:
+        """辞書componentのファイルの更新時刻を返す。ファイルが無い場合はNoneを返す。"""
+        filename = Path(__file__).parent.parent.joinpath('data').joinpath(self.__name).joinpath(Dictionary.FILES[component])
+        try:
+            return filename.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def __get_mtimes(self) -> Dict[str, Optional[int]]:
+        """すべての辞書ファイルの更新時刻を返す。"""
+        return {component: self.__get_mtime(component) for component in Dictionary.FILES}
+
+    def __save_template(self, template):
         """テンプレート辞書を保存する。"""
         filename = str(Path(__file__).parent.parent.joinpath('data').joinpath(self.__name).joinpath('template.txt'))
         with open(filename, mode='w', encoding='utf-8') as file:
-            for count, templates in self.__template.items():
-                for template in templates:
-                    file.write('{}\t{}\n'.format(count, template))
+            for count, templates in template.items():
+                for text in templates:
+                    file.write('{}\t{}\n'.format(count, text))
 
-    def __save_pattern(self):
+    def __save_pattern(self, pattern):
         """パターン辞書を保存する。"""
         filename = str(Path(__file__).parent.parent.joinpath('data').joinpath(self.__name).joinpath('pattern.txt'))
         with open(filename, mode='w', encoding='utf-8') as file:
-            for pattern in self.__pattern:
-                file.write(Dictionary.pattern2line(pattern))
+            for item in pattern:
+                file.write(Dictionary.pattern2line(item))
                 file.write('\n')
 
-    def __save_random(self):
+    def __save_random(self, random):
         """ランダム辞書を保存する。"""
         filename = str(Path(__file__).parent.parent.joinpath('data').joinpath(self.__name).joinpath('random.txt'))
         with open(filename, mode='w', encoding='utf-8') as file:
-            file.write('\n'.join(self.random))
+            file.write('\n'.join(random))
 
-    def __save_special(self):
+    def __save_special(self, special):
         """固定返事を保存する。"""
         filename = str(Path(__file__).parent.parent.joinpath('data').joinpath(self.__name).joinpath('special.json'))
         with open(filename, mode='w', encoding='utf-8') as file:
-            dump(self.__special,
+            dump(special,
                  file,
                  ensure_ascii=False,
                  indent=4,
                  sort_keys=False,
                  separators=(',', ': '))
 
-    def __save_keyword(self):
+    def __save_keyword(self, keyword):
         """キーワードを保存する。"""
         filename = str(Path(__file__).parent.parent.joinpath('data').joinpath(self.__name).joinpath('keyword.json'))
         with open(filename, mode='w', encoding='utf-8') as file:
-            dump(self.__keyword,
+            dump(keyword,
                  file,
                  ensure_ascii=False,
                  indent=4,
                  sort_keys=False,
                  separators=(',', ': '))
 
-    def __save_user_random(self):
+    def __save_user_random(self, user_random):
         """ユーザー定義ランダム辞書を保存する。"""
         filename = str(Path(__file__).parent.parent.joinpath('data').joinpath(self.__name).joinpath('user_random.json'))
         with open(filename, mode='w', encoding='utf-8') as file:
-            dump(self.__user_random,
+            dump(user_random,
                  file,
                  ensure_ascii=False,
                  indent=4,
                  sort_keys=False,
                  separators=(',', ': '))
 
-    def __find_duplicated_pattern(self, word: str):
-        """パターン辞書に名詞wordがあればパターンハッシュを、無ければNoneを返す。"""
-        return next((pattern for pattern in self.__pattern if pattern['pattern'] == word), None)
-
     def __load_random(self):
         """
         ランダム辞書を読み込み、リストを返す。
@@ -190,21 +455,22 @@ class Dictionary(object):
         filename = str(Path(__file__).parent.parent.joinpath('data').joinpath(self.__name).joinpath('pattern.txt'))
         try:
             with open(filename, mode='r', encoding='utf-8') as file:
-                return [Dictionary.line2pattern(line) for line in file.read().splitlines() if line != '']
+                patterns = (Dictionary.line2pattern(line) for line in file.read().splitlines() if line != '')
+                return [pattern for pattern in patterns if pattern]
         except FileNotFoundError:
             return []
 
     def __load_template(self):
         """テンプレート辞書を読み込み、ハッシュを返す。"""
         filename = str(Path(__file__).parent.parent.joinpath('data').joinpath(self.__name).joinpath('template.txt'))
-        templates = defaultdict(lambda: [])
+        templates = {}
         try:
             with open(filename, mode='r', encoding='utf-8') as file:
                 for line in file.read().splitlines():
                     count, template = line.split('\t')
                     if count and template:
                         count = int(count)
-                        templates[count].append(template)
+                        templates.setdefault(count, []).append(template)
                 return templates
         except FileNotFoundError:
             return templates
@@ -244,6 +510,43 @@ class Dictionary(object):
             markov.load(filename)
         return markov
 
+    def __load_learned(self, random: List[str]):
+        """
+        学習済みの文の索引を読み込む。
+        ファイルが無い場合は、ランダム辞書の文から索引を作成する。
+        """
+        filename = Path(__file__).parent.parent.joinpath('data').joinpath(self.__name).joinpath('learned.dat')
+        if filename.is_file():
+            return SentenceIndex.load(filename)
+        messages = [message for message in random if message != '[el]#moca_null#']
+        learned = SentenceIndex(len(messages))
+        learned.update(messages)
+        return learned
+
+    @staticmethod
+    def index_pattern(pattern: List[dict]) -> Dict[str, int]:
+        """パターン辞書patternの、名詞から最初に現れる位置への索引を返す。"""
+        index = {}
+        for position, item in enumerate(pattern):
+            index.setdefault(item['pattern'], position)
+        return index
+
+    @staticmethod
+    def parts2template(parts: List[Tuple[str, str]]) -> Tuple[str, int]:
+        """
+        形態素のリストpartsの名詞を'%noun%'に変更した文字列と、名詞の数を返す。
+        >>> Dictionary.parts2template([('東京', '名詞,固有名詞,地域,一般'), ('へ', '助詞,格助詞,一般,*')])
+        ('%noun%へ', 1)
+        """
+        template = ''
+        count = 0
+        for word, part in parts:
+            if is_keyword(part):
+                word = '%noun%'
+                count += 1
+            template += word
+        return template, count
+
     @staticmethod
     def pattern2line(pattern: dict):
         """
@@ -267,39 +570,49 @@ class Dictionary(object):
         if pattern and phrases:
             return {'pattern': pattern, 'phrases': phrases.split('|')}
 
+    @property
+    def snapshot(self) -> DictionarySnapshot:
+        """公開中の辞書"""
+        return self.__snapshot
+
+    @property
+    def version(self) -> int:
+        """公開中の辞書の版"""
+        return self.__snapshot.version
+
     @property
     def random(self):
         """ランダム辞書"""
-        return self.__random
+        return self.__snapshot.random
 
     @property
     def pattern(self):
         """パターン辞書"""
-        return self.__pattern
+        return self.__snapshot.pattern
 
     @property
     def template(self):
         """テンプレート辞書"""
-        return self.__template
+        return self.__snapshot.template
 
     @property
     def markov(self):
         """マルコフ辞書"""
-        return self.__markov
+        return self.__snapshot.markov
 
     @property
     def special(self):
         """固定返事"""
-        return self.__special
+        return self.__snapshot.special
 
     @property
     def keyword(self):
         """キーワード"""
-        return self.__keyword
+        return self.__snapshot.keyword
 
     @property
     def user_random(self):
         """ユーザー定義ランダム"""
-        return self.__user_random
+        return self.__snapshot.user_random
 
 # -------------------------------------------------------------------------- Dictionary --
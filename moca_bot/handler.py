@@ -0,0 +1,132 @@
+# Ω*
+#               ■          ■■■■■  
+#               ■         ■■   ■■ 
+#               ■        ■■     ■ 
+#               ■        ■■       
+#     ■■■■■     ■        ■■■      
+#    ■■   ■■    ■         ■■■     
+#   ■■     ■■   ■          ■■■■   
+#   ■■     ■■   ■            ■■■■ 
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■ 
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from asyncio import get_event_loop, run_coroutine_threadsafe
+from typing import Iterable, Optional, Tuple
+from .MocaBot import MocaBot
+from .profiling import DialogueProfiler
+from .server import DialogueServer
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- MessageHandler --------------------------------------------------------------------------
+
+
+class MessageHandler(object):
+    """
+    Discordのメッセージを受け取り、人工無脳の応答を返信する。
+    discordに依存しないため、偽のクライアントやチャンネルからも呼び出せる。
+
+    管理者は接頭辞に続けて`!profile [回数] [秒数s] [deterministic|sampling]`を送ると、
+    以降の応答をプロファイルし、終了時に上位の関数の一覧を返信させられる。
+
+    クラス定数:
+    PREFIXES -- 応答するメッセージの接頭辞
+    PROFILE_COMMAND -- プロファイルを開始するコマンド
+    """
+    PREFIXES = ('#mendako#', '#shirotako#')
+    PROFILE_COMMAND = '!profile'
+
+    def __init__(self,
+                 bot: MocaBot,
+                 server: Optional[DialogueServer] = None,
+                 show_responder: bool = False,
+                 debug: bool = False,
+                 admins: Iterable[int] = ()):
+        """
+        serverを指定した場合、応答はワーカープロセスで生成する。
+        adminsは管理者コマンドを使用できるユーザーのIDのリスト。
+        """
+        self.__bot = bot
+        self.__server = server
+        self.__show_responder = show_responder
+        self.__debug = debug
+        self.__admins = frozenset(admins)
+
+    async def handle(self, message, user) -> Optional[str]:
+        """
+        メッセージmessageが接頭辞で始まるか、ボットのユーザーuserへのメンションであれば返信する。
+        返信した文字列を返し、返信しなかった場合はNoneを返す。
+        """
+        if message.author.bot:
+            return None
+        content = message.content
+        prefix = next((prefix for prefix in MessageHandler.PREFIXES if content.startswith(prefix)), None)
+        if prefix is not None:
+            text = content[len(prefix):]
+            mention = ''
+        elif user in message.mentions:
+            text = content[content.find('>') + 1:]
+            mention = f'{message.author.mention} '
+        else:
+            return None
+
+        if text.startswith(MessageHandler.PROFILE_COMMAND) and message.author.id in self.__admins:
+            reply = self.__profile(message.channel, text[len(MessageHandler.PROFILE_COMMAND):].split())
+            await message.channel.send(reply)
+            return reply
+
+        response, responder_name = await self.dialogue(text)
+        if self.__show_responder:
+            reply = f'{mention}{responder_name}: {response}'
+        else:
+            reply = f'{mention}{response}'
+        await message.channel.send(reply)
+        if self.__debug:
+            print(f'メッセージ受信: {text}')
+            print(f'返事: {response}')
+        return reply
+
+    async def dialogue(self, message: str) -> Tuple[str, str]:
+        """メッセージへの応答を生成し、(応答, Responderの名前)を返す。"""
+        if self.__server is not None:
+            return await self.__server.dialogue(message)
+        return self.__bot.dialogue(message), self.__bot.responder_name
+
+    def __profile(self, channel, args) -> str:
+        """プロファイルを開始し、開始したことを伝える返信を返す。終了時には結果をchannelに送信する。"""
+        if self.__server is not None:
+            return 'ワーカープロセスで応答しているため、プロファイルできません。'
+        dialogues, seconds, mode = 0, 0.0, 'deterministic'
+        try:
+            for arg in args:
+                if arg in DialogueProfiler.MODES:
+                    mode = arg
+                elif arg.endswith('s'):
+                    seconds = float(arg[:-1])
+                else:
+                    dialogues = int(arg)
+        except ValueError:
+            return f'使い方: {MessageHandler.PROFILE_COMMAND} [回数] [秒数s] [deterministic|sampling]'
+        loop = get_event_loop()
+
+        def report(profiler: DialogueProfiler) -> None:
+            # 計測は応答処理やタイマーのスレッドで終了するため、イベントループに送信を依頼する
+            name = '書き込みに失敗しました' if profiler.path is None else profiler.path.name
+            summary = profiler.summary[:1800]
+            run_coroutine_threadsafe(channel.send(f'プロファイル終了: {name}\n```\n{summary}```'), loop)
+
+        try:
+            profiler = self.__bot.profile(dialogues, seconds, mode, report)
+        except RuntimeError:
+            return 'すでにプロファイル中です。'
+        return f'プロファイルを開始しました。({profiler.mode})'
+
+# -------------------------------------------------------------------------- MessageHandler --
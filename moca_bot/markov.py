@@ -17,12 +17,14 @@
 
 # -- Imports --------------------------------------------------------------------------
 
-from random import choice
-from collections import defaultdict
+from random import choice, choices
+from collections import Counter, deque
 from copy import copy
 from dill import load, dump
-from typing import List, Optional, Union, Tuple
+from typing import List, Optional, Union, Tuple, Dict, Set
 from pathlib import Path
+from heapq import nlargest
+from .measure import deep_sizeof, distribution
 
 # -------------------------------------------------------------------------- Imports --
 
@@ -41,11 +43,26 @@ class Markov(object):
 
     def __init__(self):
         """インスタンス変数の初期化。
-        self.__dic -- マルコフ辞書。 __dic['prefix1']['prefix2'] == ['suffixes']
+        self.__dic -- マルコフ辞書。 __dic['prefix1']['prefix2'] == {'suffix': count}
         self.__starts -- 文章が始まる単語の数。 __starts['prefix'] == count
         """
-        self.__dic = defaultdict(lambda: defaultdict(lambda: []))
-        self.__starts = defaultdict(lambda: 0)
+        self.__dic: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self.__starts: Dict[str, int] = {}
+        # copy()で作成した場合、このインスタンスが書き換えてよい(共有していない)辞書のキー
+        self.__owned: Optional[Set[str]] = None
+        self.__owned_pairs: Optional[Set[Tuple[str, str]]] = None
+
+    def copy(self) -> 'Markov':
+        """
+        辞書を共有するコピーを返す。
+        コピーに学習させた場合、変更するprefixの辞書だけを複製するため、元のインスタンスは変更されない。
+        """
+        markov = Markov()
+        markov.__dic = dict(self.__dic)
+        markov.__starts = dict(self.__starts)
+        markov.__owned = set()
+        markov.__owned_pairs = set()
+        return markov
 
     def add_sentence(self, parts: List[Tuple[str, str]]) -> None:
         """形態素解析結果partsを分解し、学習を行う。"""
@@ -75,7 +92,7 @@ class Markov(object):
             return None
         else:
             # keywordがprefix1として登録されていない場合、__startsからランダムに選択する
-            prefix1 = keyword if self.__dic[keyword] else choice(list(self.__starts.keys()))
+            prefix1 = keyword if self.__dic.get(keyword) else choice(list(self.__starts.keys()))
 
             # prefix1をもとにprefix2をランダムに選択する
             prefix2 = choice(list(self.__dic[prefix1].keys()))
@@ -84,10 +101,11 @@ class Markov(object):
             words = [prefix1, prefix2]
 
             # 最大CHAIN_MAX回のループを回し、単語を選択してwordsを拡張していく
-            # ランダムに選択したsuffixがENDMARKであれば終了し、単語であればwordsに追加する
+            # 出現回数で重み付けしたsuffixがENDMARKであれば終了し、単語であればwordsに追加する
             # その後prefix1, prefix2をスライドさせて始めに戻る
             for _ in range(Markov.CHAIN_MAX):
-                suffix = choice(self.__dic[prefix1][prefix2])
+                suffixes = self.__dic[prefix1][prefix2]
+                suffix = choices(list(suffixes.keys()), list(suffixes.values()))[0]
                 if suffix == Markov.ENDMARK:
                     break
                 words.append(suffix)
@@ -95,10 +113,126 @@ class Markov(object):
 
             return ''.join(words)
 
+    def compact(self, threshold: int = 1) -> None:
+        """
+        出現回数がthreshold未満の遷移を削除し、辞書を縮小する。
+        ENDMARKに到達できないprefixと、文章の開始点から到達できないprefixも削除する。
+        """
+        # 出現回数の少ない遷移を削除する
+        dic = {}
+        for prefix1, prefix2s in self.__dic.items():
+            for prefix2, suffixes in prefix2s.items():
+                kept = {suffix: count for suffix, count in suffixes.items() if count >= threshold}
+                if kept:
+                    dic.setdefault(prefix1, {})[prefix2] = kept
+
+        # ENDMARKに到達できる(prefix1, prefix2)を後ろ向きに求める
+        # suffixから見た遷移元の一覧を作り、ENDMARKを持つprefixから辿る
+        sources: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        queue = deque()
+        alive: Set[Tuple[str, str]] = set()
+        for prefix1, prefix2s in dic.items():
+            for prefix2, suffixes in prefix2s.items():
+                for suffix in suffixes:
+                    if suffix == Markov.ENDMARK:
+                        if (prefix1, prefix2) not in alive:
+                            alive.add((prefix1, prefix2))
+                            queue.append((prefix1, prefix2))
+                    else:
+                        sources.setdefault((prefix2, suffix), []).append((prefix1, prefix2))
+        while queue:
+            for source in sources.get(queue.popleft(), ()):
+                if source not in alive:
+                    alive.add(source)
+                    queue.append(source)
+        del sources
+
+        # 行き止まりに向かう遷移を削除する
+        for prefix1, prefix2s in dic.items():
+            for prefix2, suffixes in prefix2s.items():
+                if (prefix1, prefix2) in alive:
+                    prefix2s[prefix2] = {
+                        suffix: count for suffix, count in suffixes.items()
+                        if suffix == Markov.ENDMARK or (prefix2, suffix) in alive
+                    }
+
+        # 文章の開始点から前向きに辿り、到達できる(prefix1, prefix2)のみを残す
+        starts = {prefix1: count for prefix1, count in self.__starts.items() if prefix1 in dic}
+        reached: Set[Tuple[str, str]] = set()
+        for prefix1 in starts:
+            for prefix2 in dic[prefix1]:
+                if (prefix1, prefix2) in alive and (prefix1, prefix2) not in reached:
+                    reached.add((prefix1, prefix2))
+                    queue.append((prefix1, prefix2))
+        while queue:
+            prefix1, prefix2 = queue.popleft()
+            for suffix in dic[prefix1][prefix2]:
+                if suffix != Markov.ENDMARK and (prefix2, suffix) not in reached:
+                    reached.add((prefix2, suffix))
+                    queue.append((prefix2, suffix))
+
+        compacted = {}
+        for prefix1, prefix2 in reached:
+            compacted.setdefault(prefix1, {})[prefix2] = dic[prefix1][prefix2]
+        self.__dic = compacted
+        self.__starts = {prefix1: count for prefix1, count in starts.items() if prefix1 in compacted}
+        self.__owned = self.__owned_pairs = None
+
+    def size(self) -> Tuple[int, int, int]:
+        """(prefixの組の数, 異なる遷移の数, 遷移の総出現回数)を返す。"""
+        prefixes = transitions = total = 0
+        for prefix2s in self.__dic.values():
+            prefixes += len(prefix2s)
+            for suffixes in prefix2s.values():
+                transitions += len(suffixes)
+                total += sum(suffixes.values())
+        return prefixes, transitions, total
+
+    def stats(self, top: int = 10) -> dict:
+        """
+        辞書の要素数、推定メモリ使用量、prefixごとの分岐数と遷移数の分布、遷移の多いprefixの上位top件を返す。
+        辞書を複製せずに集計する。
+        """
+        dic, starts = self.__dic, self.__starts
+        prefixes, transitions, total = self.size()
+        heaviest = nlargest(top,
+                            dic.items(),
+                            key=lambda item: sum(len(suffixes) for suffixes in item[1].values()))
+        return {
+            'prefix1': len(dic),
+            'prefixes': prefixes,
+            'transitions': transitions,
+            'occurrences': total,
+            'starts': len(starts),
+            'bytes': deep_sizeof((dic, starts)),
+            'prefix2_fanout': distribution(len(prefix2s) for prefix2s in dic.values()),
+            'suffix_fanout': distribution(len(suffixes) for prefix2s in dic.values() for suffixes in prefix2s.values()),
+            'suffix_occurrences': distribution(sum(suffixes.values())
+                                               for prefix2s in dic.values() for suffixes in prefix2s.values()),
+            'heaviest_prefixes': [
+                {
+                    'prefix': prefix1,
+                    'prefix2': len(prefix2s),
+                    'transitions': sum(len(suffixes) for suffixes in prefix2s.values()),
+                    'bytes': deep_sizeof(prefix2s),
+                }
+                for prefix1, prefix2s in heaviest
+            ],
+        }
+
     def load(self, filename: Union[Path, str]):
-        """ファイルfilenameから辞書データを読み込む。"""
+        """
+        ファイルfilenameから辞書データを読み込む。
+        suffixをリストで保持していた旧形式のファイルは出現回数に変換する。
+        """
         with open(str(filename), 'rb') as file:
-            self.__dic, self.__starts = load(file)
+            dic, starts = load(file)
+        self.__dic = {
+            prefix1: {prefix2: dict(Counter(suffixes)) for prefix2, suffixes in prefix2s.items() if suffixes}
+            for prefix1, prefix2s in dic.items() if prefix2s
+        }
+        self.__starts = dict(starts)
+        self.__owned = self.__owned_pairs = None
 
     def save(self, filename: Union[Path, str]):
         """ファイルfilenameへ辞書データを書き込む。"""
@@ -106,9 +240,21 @@ class Markov(object):
             dump((self.__dic, self.__starts), file)
 
     def __add_suffix(self, prefix1, prefix2, suffix):
-        self.__dic[prefix1][prefix2].append(suffix)
+        if self.__owned is None:
+            suffixes = self.__dic.setdefault(prefix1, {}).setdefault(prefix2, {})
+        else:
+            # 元のインスタンスと共有している辞書は、書き換える前に複製する
+            prefix2s = self.__dic.get(prefix1, {})
+            if prefix1 not in self.__owned:
+                prefix2s = self.__dic[prefix1] = dict(prefix2s)
+                self.__owned.add(prefix1)
+            suffixes = prefix2s.get(prefix2, {})
+            if (prefix1, prefix2) not in self.__owned_pairs:
+                suffixes = prefix2s[prefix2] = dict(suffixes)
+                self.__owned_pairs.add((prefix1, prefix2))
+        suffixes[suffix] = suffixes.get(suffix, 0) + 1
 
     def __add_start(self, prefix1):
-        self.__starts[prefix1] += 1
+        self.__starts[prefix1] = self.__starts.get(prefix1, 0) + 1
 
 # -------------------------------------------------------------------------- Markov --
@@ -0,0 +1,83 @@
+# Ω*
+#               ■          ■■■■■  
+#               ■         ■■   ■■ 
+#               ■        ■■     ■ 
+#               ■        ■■       
+#     ■■■■■     ■        ■■■      
+#    ■■   ■■    ■         ■■■     
+#   ■■     ■■   ■          ■■■■   
+#   ■■     ■■   ■            ■■■■ 
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■ 
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from sys import getsizeof
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- Public Functions --------------------------------------------------------------------------
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    objと、objから辿れるオブジェクトのメモリ使用量(バイト)の推定値を返す。
+    seenに含まれるオブジェクトは数えない。複数の呼び出しでseenを共有すると、共有しているオブジェクトを重複して数えない。
+    オブジェクトを複製せず、参照を辿るだけで計算する。
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)):
+            continue
+        seen.add(id(item))
+        size += getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        else:
+            if hasattr(item, '__dict__'):
+                stack.append(vars(item))
+            for name in getattr(type(item), '__slots__', ()):
+                if hasattr(item, name):
+                    stack.append(getattr(item, name))
+    return size
+
+
+def percentile(values: List[float], q: float) -> float:
+    """昇順に並んだvaluesのq%点を返す。"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+def distribution(values: Iterable[float]) -> Dict[str, float]:
+    """valuesの件数、合計、最小、平均、50/90/99%点、最大を返す。"""
+    values = sorted(values)
+    if not values:
+        return {'count': 0, 'sum': 0, 'min': 0, 'mean': 0.0, 'p50': 0, 'p90': 0, 'p99': 0, 'max': 0}
+    return {
+        'count': len(values),
+        'sum': sum(values),
+        'min': values[0],
+        'mean': sum(values) / len(values),
+        'p50': percentile(values, 50),
+        'p90': percentile(values, 90),
+        'p99': percentile(values, 99),
+        'max': values[-1],
+    }
+
+# -------------------------------------------------------------------------- Public Functions --
@@ -15,26 +15,169 @@
 #     ■■■■■     ■   ■■■    ■■■■■
 
 
+
 # -- Imports --------------------------------------------------------------------------
 
-from typing import Tuple, List
+from abc import ABCMeta, abstractmethod
+from os import environ
+from threading import Lock
+from typing import Tuple, List, Dict, Type, Optional
 from re import match
-from janome.tokenizer import Tokenizer
 
 # -------------------------------------------------------------------------- Imports --
 
+# -- Tokenizer Backends --------------------------------------------------------------------------
+
+
+class TokenizerBackend(metaclass=ABCMeta):
+    """
+    形態素解析器の基底クラス。
+    品詞はjanome(IPADIC)と同じ`品詞,品詞細分類1,品詞細分類2,品詞細分類3`の形式で返す。
+
+    クラス定数:
+    NAME -- 形態素解析器の名前
+    """
+    NAME = ''
+
+    @abstractmethod
+    def tokenize(self, message: str) -> List[Tuple[str, str]]:
+        """メッセージを形態素解析し、[(surface, parts)]の形にして返す。"""
+        pass
+
+    def tokenize_chunk(self, messages: List[str]) -> List[List[Tuple[str, str]]]:
+        """メッセージのリストmessagesを形態素解析し、メッセージごとの結果を返す。"""
+        return [self.tokenize(message) for message in messages]
+
+
+class JanomeBackend(TokenizerBackend):
+    """janome(Pure Python)による形態素解析。標準の形態素解析器。"""
+    NAME = 'janome'
+
+    def __init__(self):
+        from janome.tokenizer import Tokenizer
+        self.__tokenizer = Tokenizer()
+
+    def tokenize(self, message: str) -> List[Tuple[str, str]]:
+        return [(token.surface, token.part_of_speech) for token in self.__tokenizer.tokenize(message)]
+
+    def tokenize_chunk(self, messages: List[str]) -> List[List[Tuple[str, str]]]:
+        """
+        改行を含まないメッセージのリストmessagesをまとめて形態素解析し、メッセージごとの結果を返す。
+        メッセージを改行で連結して一度に解析し、改行の位置で分割する。
+        """
+        results = [[]]
+        for token in self.__tokenizer.tokenize('\n'.join(messages)):
+            if '\n' in token.surface:
+                results.extend([] for _ in range(token.surface.count('\n')))
+            else:
+                results[-1].append((token.surface, token.part_of_speech))
+        if len(results) != len(messages):
+            # 改行が正しく分割されなかった場合は一件ずつ解析する
+            return [self.tokenize(message) for message in messages]
+        return results
+
+
+class MeCabBackend(TokenizerBackend):
+    """
+    MeCab(mecab-python3)による形態素解析。IPADICを使用する。
+    ipadicパッケージがあればその辞書を、無ければシステムの標準の辞書を使用する。
+    MeCabは空白を次の形態素に含めて読み飛ばすため、janomeと同じく文頭以外の空白を'記号,空白'の形態素として返す。
+    """
+    SPACE = '記号,空白,*,*'
+
+    NAME = 'mecab'
+
+    def __init__(self):
+        from MeCab import Tagger
+        try:
+            from ipadic import MECAB_ARGS
+        except ImportError:
+            MECAB_ARGS = ''
+        self.__tagger = Tagger(MECAB_ARGS)
+
+    def tokenize(self, message: str) -> List[Tuple[str, str]]:
+        parts = []
+        # node.lengthとnode.rlength(直前の空白を含む長さ)はバイト数であるため、UTF-8のバイト列で位置を数える
+        encoded = message.encode('utf-8')
+        position = 0
+        node = self.__tagger.parseToNode(message)
+        while node:
+            # 文頭・文末を表すノード(BOS/EOS)は除く
+            if node.stat not in (2, 3):
+                space = node.rlength - node.length
+                if space > 0 and parts:
+                    parts.append((encoded[position:position + space].decode('utf-8'), MeCabBackend.SPACE))
+                position += node.rlength
+                parts.append((node.surface, ','.join(node.feature.split(',')[:4])))
+            node = node.next
+        return parts
+
+
+# 使用できる形態素解析器
+BACKENDS: Dict[str, Type[TokenizerBackend]] = {
+    JanomeBackend.NAME: JanomeBackend,
+    MeCabBackend.NAME: MeCabBackend,
+}
+
+# -------------------------------------------------------------------------- Tokenizer Backends --
+
 # -- Init --------------------------------------------------------------------------
 
-TOKENIZER = Tokenizer()
+# 使用中の形態素解析器。最初に使用するときに作成する
+BACKEND: Optional[TokenizerBackend] = None
+
+# BACKENDを作成・差し替えるときのロック
+BACKEND_LOCK = Lock()
 
 # -------------------------------------------------------------------------- Init --
 
 # -- Public Functions --------------------------------------------------------------------------
 
 
+def backend_name(configured: str = '') -> str:
+    """
+    使用する形態素解析器の名前を返す。
+    環境変数MOCA_BOT_TOKENIZER、設定値configured、janomeの順に優先する。
+    対応していない名前の場合はValueErrorを送出する。
+    """
+    name = environ.get('MOCA_BOT_TOKENIZER') or configured or JanomeBackend.NAME
+    if name not in BACKENDS:
+        raise ValueError(f'unknown tokenizer: {name} (available: {", ".join(sorted(BACKENDS))})')
+    return name
+
+
+def set_backend(name: str) -> TokenizerBackend:
+    """
+    形態素解析器をnameに切り替える。
+    対応していない名前の場合はValueErrorを、対応するパッケージがインストールされていない場合はImportErrorを送出する。
+    """
+    global BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f'unknown tokenizer: {name} (available: {", ".join(sorted(BACKENDS))})')
+    with BACKEND_LOCK:
+        if BACKEND is None or name != BACKEND.NAME:
+            BACKEND = BACKENDS[name]()
+        return BACKEND
+
+
+def get_backend() -> TokenizerBackend:
+    """使用中の形態素解析器を返す。まだ選択されていない場合はbackend_name()の形態素解析器を作成する。"""
+    global BACKEND
+    if BACKEND is None:
+        with BACKEND_LOCK:
+            if BACKEND is None:
+                BACKEND = BACKENDS[backend_name()]()
+    return BACKEND
+
+
 def analyze(message: str) -> List[Tuple[str, str]]:
     """メッセージを形態素解析し、[(surface, parts)]の形にして返す。"""
-    return [(token.surface, token.part_of_speech) for token in TOKENIZER.tokenize(message)]
+    return get_backend().tokenize(message)
+
+
+def analyze_chunk(messages: List[str]) -> List[List[Tuple[str, str]]]:
+    """改行を含まないメッセージのリストmessagesをまとめて形態素解析し、メッセージごとの結果を返す。"""
+    return get_backend().tokenize_chunk(messages)
 
 
 def is_keyword(part: str) -> bool:
@@ -0,0 +1,232 @@
+# Ω*
+#               ■          ■■■■■  
+#               ■         ■■   ■■ 
+#               ■        ■■     ■ 
+#               ■        ■■       
+#     ■■■■■     ■        ■■■      
+#    ■■   ■■    ■         ■■■     
+#   ■■     ■■   ■          ■■■■   
+#   ■■     ■■   ■            ■■■■ 
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■ 
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from cProfile import Profile
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from sys import _current_frames
+from threading import Event, Lock, Thread, Timer, get_ident
+from traceback import print_exc
+from typing import Callable, List, Optional, Set
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- DialogueProfiler --------------------------------------------------------------------------
+
+
+class DialogueProfiler(object):
+    """
+    応答処理をプロファイルし、結果をファイルと上位の関数の一覧にまとめる。
+    wrapperを応答処理の代わりに呼び出している間だけ計測するため、使用していない時の負荷は無い。
+
+    モード:
+    deterministic -- cProfileですべての関数呼び出しを計測し、.profファイル(pstats形式)を書き込む
+    sampling -- interval秒ごとに応答処理中のスタックを記録し、.collapsed.txt(flamegraph形式)を書き込む
+
+    プロパティ:
+    mode -- プロファイルのモード
+    count -- 計測した応答の数
+    running -- 計測中であるかどうか
+    path -- 書き込んだプロファイルのファイル
+    summary -- 上位の関数の一覧
+    """
+    MODES = ('deterministic', 'sampling')
+
+    def __init__(self,
+                 target: Callable,
+                 directory: Path,
+                 dialogues: int = 0,
+                 seconds: float = 0.0,
+                 mode: str = 'deterministic',
+                 interval: float = 0.005,
+                 top: int = 15,
+                 callback: Optional[Callable[['DialogueProfiler'], None]] = None):
+        """
+        応答処理targetを、dialogues回呼び出されるか、seconds秒経過するまで計測する。
+        どちらも0の場合は100回とする。計測が終わると結果をdirectoryに書き込み、callbackを呼び出す。
+        """
+        if mode not in DialogueProfiler.MODES:
+            raise ValueError(f'unknown profiling mode: {mode}')
+        self.__target = target
+        self.__directory = directory
+        self.__dialogues = dialogues if dialogues > 0 or seconds > 0 else 100
+        self.__seconds = seconds
+        self.__mode = mode
+        self.__interval = interval
+        self.__top = top
+        self.__callback = callback
+        self.__lock = Lock()
+        self.__count = 0
+        self.__running = False
+        self.__path: Optional[Path] = None
+        self.__summary = ''
+        self.__profile = Profile()
+        self.__samples: Counter = Counter()
+        self.__threads: Set[int] = set()
+        self.__stopped = Event()
+        self.__timer: Optional[Timer] = None
+        self.__sampler: Optional[Thread] = None
+
+    def start(self) -> None:
+        """計測を開始する。"""
+        self.__running = True
+        if self.__mode == 'sampling':
+            self.__sampler = Thread(target=self.__sample, name='DialogueProfiler', daemon=True)
+            self.__sampler.start()
+        if self.__seconds > 0:
+            self.__timer = Timer(self.__seconds, self.stop)
+            self.__timer.daemon = True
+            self.__timer.start()
+
+    def wrapper(self, *args, **kwargs):
+        """応答処理の代わりに呼び出す。"""
+        if self.__mode == 'deterministic':
+            # cProfileは同時に一つのスレッドでしか計測できないため、計測中の応答は一つずつ処理する
+            with self.__lock:
+                if not self.__running:
+                    return self.__target(*args, **kwargs)
+                self.__profile.enable()
+                try:
+                    result = self.__target(*args, **kwargs)
+                finally:
+                    self.__profile.disable()
+        else:
+            ident = get_ident()
+            self.__threads.add(ident)
+            try:
+                result = self.__target(*args, **kwargs)
+            finally:
+                self.__threads.discard(ident)
+        self.__count += 1
+        if 0 < self.__dialogues <= self.__count:
+            # 結果の書き込みに失敗しても、応答処理には影響させない
+            try:
+                self.stop()
+            except Exception:
+                print_exc()
+        return result
+
+    def stop(self) -> None:
+        """
+        計測を終了し、結果を書き込んでcallbackを呼び出す。二回目以降の呼び出しは何もしない。
+        結果の書き込みに失敗した場合もcallbackは呼び出す。その場合、pathはNoneのままとなる。
+        """
+        with self.__lock:
+            if not self.__running:
+                return
+            self.__running = False
+        self.__stopped.set()
+        if self.__timer is not None:
+            self.__timer.cancel()
+        if self.__sampler is not None:
+            self.__sampler.join()
+        try:
+            self.__directory.mkdir(parents=True, exist_ok=True)
+            name = datetime.now().strftime(f'dialogue-{self.__mode}-%Y%m%d-%H%M%S')
+            if self.__mode == 'deterministic':
+                path = self.__directory.joinpath(f'{name}.prof')
+                self.__profile.dump_stats(str(path))
+                self.__summary = self.__deterministic_summary()
+            else:
+                path = self.__directory.joinpath(f'{name}.collapsed.txt')
+                with open(str(path), mode='w', encoding='utf-8') as file:
+                    for stack, count in self.__samples.most_common():
+                        file.write(f'{stack} {count}\n')
+                self.__summary = self.__sampling_summary()
+            with open(str(self.__directory.joinpath(f'{name}.summary.txt')), mode='w', encoding='utf-8') as file:
+                file.write(self.__summary)
+            self.__path = path
+        finally:
+            if self.__callback is not None:
+                self.__callback(self)
+
+    def __sample(self) -> None:
+        """interval秒ごとに、応答処理中のスレッドのスタックを記録する。"""
+        wrapper_code = DialogueProfiler.wrapper.__code__
+        while not self.__stopped.wait(self.__interval):
+            frames = _current_frames()
+            for ident in list(self.__threads):
+                frame = frames.get(ident)
+                stack: List[str] = []
+                while frame is not None and frame.f_code is not wrapper_code:
+                    code = frame.f_code
+                    stack.append(f'{Path(code.co_filename).name}:{code.co_name}:{code.co_firstlineno}')
+                    frame = frame.f_back
+                if stack:
+                    self.__samples[';'.join(reversed(stack))] += 1
+
+    def __deterministic_summary(self) -> str:
+        """自身の処理時間が長い関数の一覧を返す。一度も応答しなかった場合は見出しだけを返す。"""
+        # pstats.Statsは計測結果が空の場合に例外を送出するため、cProfileの集計結果を直接使用する
+        self.__profile.create_stats()
+        stats = self.__profile.stats
+        total = sum(tottime for _, _, tottime, _, _ in stats.values())
+        lines = [f'deterministic: {self.__count}件の応答, 合計 {total * 1000:.1f}ms',
+                 '   self(ms)     cum(ms)    calls  function']
+        ranking = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:self.__top]
+        for (filename, line, function), (_, calls, tottime, cumtime, _) in ranking:
+            lines.append(f'{tottime * 1000:11.2f} {cumtime * 1000:11.2f} {calls:8d}  '
+                         f'{function} ({Path(filename).name}:{line})')
+        return '\n'.join(lines) + '\n'
+
+    def __sampling_summary(self) -> str:
+        """サンプル数の多い関数の一覧を、自身(スタックの末尾)と呼び出し先を含めた数で返す。"""
+        total = sum(self.__samples.values())
+        leaf = Counter()
+        inclusive = Counter()
+        for stack, count in self.__samples.items():
+            frames = stack.split(';')
+            leaf[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+        lines = [f'sampling: {self.__count}件の応答, {total}サンプル ({self.__interval * 1000:.1f}ms間隔)',
+                 '   self(%)    cum(%)  function']
+        # 一度も応答しなかった場合、totalは0で一覧は空になる
+        for frame, count in leaf.most_common(self.__top):
+            lines.append(f'{count / total * 100:9.1f} {inclusive[frame] / total * 100:9.1f}  {frame}')
+        return '\n'.join(lines) + '\n'
+
+    @property
+    def mode(self) -> str:
+        """プロファイルのモード"""
+        return self.__mode
+
+    @property
+    def count(self) -> int:
+        """計測した応答の数"""
+        return self.__count
+
+    @property
+    def running(self) -> bool:
+        """計測中であるかどうか"""
+        return self.__running
+
+    @property
+    def path(self) -> Optional[Path]:
+        """書き込んだプロファイルのファイル"""
+        return self.__path
+
+    @property
+    def summary(self) -> str:
+        """上位の関数の一覧"""
+        return self.__summary
+
+# -------------------------------------------------------------------------- DialogueProfiler --
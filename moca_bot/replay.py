@@ -0,0 +1,234 @@
+# Ω*
+#               ■          ■■■■■  
+#               ■         ■■   ■■ 
+#               ■        ■■     ■ 
+#               ■        ■■       
+#     ■■■■■     ■        ■■■      
+#    ■■   ■■    ■         ■■■     
+#   ■■     ■■   ■          ■■■■   
+#   ■■     ■■   ■            ■■■■ 
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■ 
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from argparse import ArgumentParser
+from asyncio import Semaphore, TimeoutError, gather, get_event_loop, run, sleep, wait_for
+from pathlib import Path
+from random import Random
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional
+from .MocaBot import MocaBot
+from .handler import MessageHandler
+from .measure import percentile
+from .server import DialogueServer
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- Fake Discord --------------------------------------------------------------------------
+
+
+class FakeUser(object):
+    """discord.Userの代わりに使用するユーザー。"""
+
+    def __init__(self, user_id: int, name: str, bot: bool = False):
+        self.id = user_id
+        self.name = name
+        self.bot = bot
+
+    @property
+    def mention(self) -> str:
+        return f'<@{self.id}>'
+
+
+class FakeChannel(object):
+    """discord.TextChannelの代わりに使用するチャンネル。送信されたメッセージを記録する。"""
+
+    def __init__(self, latency: float = 0.0):
+        """latency秒だけ送信を待たせ、Discordとの通信を模擬する。"""
+        self.latency = latency
+        self.sent: List[str] = []
+
+    async def send(self, content: str) -> None:
+        if self.latency > 0:
+            await sleep(self.latency)
+        self.sent.append(content)
+
+
+class FakeMessage(object):
+    """discord.Messageの代わりに使用するメッセージ。"""
+
+    def __init__(self, content: str, author: FakeUser, channel: FakeChannel, mentions: List[FakeUser]):
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.mentions = mentions
+
+# -------------------------------------------------------------------------- Fake Discord --
+
+# -- Messages --------------------------------------------------------------------------
+
+
+def synthetic_messages(texts: List[str], count: int, seed: Optional[int] = None) -> List[str]:
+    """
+    textsからcount件のメッセージを作成する。
+    接頭辞(#shirotako#, #mendako#)、メンション({bot})、応答しない雑談をおよそ4:3:2:1の割合で混ぜる。
+    """
+    random = Random(seed)
+    kinds = ['#shirotako#{}'] * 4 + ['#mendako#{}'] * 3 + ['{{bot}} {}'] * 2 + ['{}']
+    return [random.choice(kinds).format(random.choice(texts)) for _ in range(count)]
+
+
+def load_messages(filename: Path) -> List[str]:
+    """記録したメッセージを一行一件で読み込む。{bot}はボットへのメンションに置き換える。"""
+    with open(str(filename), mode='r', encoding='utf-8') as file:
+        return [line for line in file.read().splitlines() if line]
+
+# -------------------------------------------------------------------------- Messages --
+
+# -- Replay --------------------------------------------------------------------------
+
+
+async def replay(handler: MessageHandler,
+                 contents: Iterable[str],
+                 rate: float = 100.0,
+                 concurrency: int = 100,
+                 timeout: float = 10.0,
+                 send_latency: float = 0.0,
+                 lag_interval: float = 0.01) -> Dict[str, float]:
+    """
+    メッセージcontentsを毎秒rate件のペースでhandlerに渡し、結果の統計を返す。
+    同時に処理するメッセージはconcurrency件までとし、超えた分は待たせる。
+    timeout秒以内に返信されなかったメッセージと、例外が発生したメッセージは取りこぼしとして数える。
+    """
+    loop = get_event_loop()
+    bot_user = FakeUser(1, 'shirotako', bot=True)
+    users = [FakeUser(100 + i, f'user{i}') for i in range(10)]
+    channel = FakeChannel(send_latency)
+    semaphore = Semaphore(concurrency)
+    latencies: List[float] = []
+    lags: List[float] = []
+    counts = {'expected': 0, 'replied': 0, 'timeout': 0, 'error': 0}
+    running = True
+
+    async def monitor() -> None:
+        # イベントループが指定した時間どおりに処理を再開できるかを計測する
+        while running:
+            started = perf_counter()
+            await sleep(lag_interval)
+            lags.append(perf_counter() - started - lag_interval)
+
+    async def deliver(message: FakeMessage, arrived: float, expected: bool) -> None:
+        async with semaphore:
+            try:
+                reply = await wait_for(handler.handle(message, bot_user), timeout - (perf_counter() - arrived))
+            except TimeoutError:
+                counts['timeout'] += 1
+                return
+            except Exception:
+                counts['error'] += 1
+                return
+        if reply is not None:
+            counts['replied'] += 1
+            latencies.append(perf_counter() - arrived)
+        elif expected:
+            counts['error'] += 1
+
+    monitor_task = loop.create_task(monitor())
+    tasks = []
+    started = perf_counter()
+    for i, content in enumerate(contents):
+        # 到着予定時刻まで待ってから、Discordと同様にメッセージごとにタスクを作成する
+        delay = started + i / rate - perf_counter()
+        if delay > 0:
+            await sleep(delay)
+        mentions = [bot_user] if '{bot}' in content else []
+        author = users[i % len(users)]
+        message = FakeMessage(content.replace('{bot}', bot_user.mention), author, channel, mentions)
+        expected = bool(mentions) or content.startswith(MessageHandler.PREFIXES)
+        counts['expected'] += expected
+        tasks.append(loop.create_task(deliver(message, perf_counter(), expected)))
+    input_elapsed = perf_counter() - started
+    await gather(*tasks)
+    elapsed = perf_counter() - started
+    running = False
+    await monitor_task
+
+    latencies.sort()
+    lags.sort()
+    return {
+        'messages': len(tasks),
+        'expected': counts['expected'],
+        'replied': counts['replied'],
+        'dropped': counts['timeout'] + counts['error'],
+        'timeout': counts['timeout'],
+        'error': counts['error'],
+        'input_rate': len(tasks) / input_elapsed if input_elapsed > 0 else 0.0,
+        'throughput': counts['replied'] / elapsed if elapsed > 0 else 0.0,
+        'elapsed': elapsed,
+        'latency_p50': percentile(latencies, 50),
+        'latency_p90': percentile(latencies, 90),
+        'latency_p99': percentile(latencies, 99),
+        'latency_max': latencies[-1] if latencies else 0.0,
+        'loop_lag_p50': percentile(lags, 50),
+        'loop_lag_p99': percentile(lags, 99),
+        'loop_lag_max': lags[-1] if lags else 0.0,
+    }
+
+
+def print_report(report: Dict[str, float]) -> None:
+    """replayの結果を表示する。"""
+    print(f"メッセージ: {report['messages']}件 (入力 {report['input_rate']:.1f}件/秒)")
+    print(f"返信: {report['replied']}/{report['expected']}件 "
+          f"(取りこぼし {report['dropped']}件: タイムアウト {report['timeout']}件, エラー {report['error']}件)")
+    print(f"スループット: {report['throughput']:.1f}件/秒 ({report['elapsed']:.2f}秒)")
+    print(f"応答時間: p50 {report['latency_p50'] * 1000:.1f}ms / p90 {report['latency_p90'] * 1000:.1f}ms / "
+          f"p99 {report['latency_p99'] * 1000:.1f}ms / 最大 {report['latency_max'] * 1000:.1f}ms")
+    print(f"イベントループの遅延: p50 {report['loop_lag_p50'] * 1000:.1f}ms / "
+          f"p99 {report['loop_lag_p99'] * 1000:.1f}ms / 最大 {report['loop_lag_max'] * 1000:.1f}ms")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = ArgumentParser(description='Discordに接続せずにメッセージを再生し、ボットの応答性能を計測する。')
+    parser.add_argument('name', nargs='?', default='shirotako', help='辞書の名前 (data/<name>/)')
+    parser.add_argument('-l', '--log', type=Path, default=None, help='再生するメッセージ (一行一件)')
+    parser.add_argument('-n', '--count', type=int, default=1000, help='合成するメッセージの件数')
+    parser.add_argument('-r', '--rate', type=float, default=100.0, help='一秒あたりのメッセージ数')
+    parser.add_argument('-c', '--concurrency', type=int, default=100, help='同時に処理するメッセージ数')
+    parser.add_argument('-t', '--timeout', type=float, default=10.0, help='取りこぼしとみなすまでの秒数')
+    parser.add_argument('-w', '--workers', type=int, default=0, help='DialogueServerのワーカープロセス数')
+    parser.add_argument('--send-latency', type=float, default=0.0, help='送信にかかる秒数')
+    parser.add_argument('--seed', type=int, default=None, help='メッセージを合成する乱数のシード')
+    args = parser.parse_args(argv)
+
+    bot = MocaBot(args.name)
+    server = DialogueServer(bot, args.workers) if args.workers > 0 else None
+    if args.log is not None:
+        contents = load_messages(args.log)
+    else:
+        filename = Path(__file__).parent.parent.joinpath('data').joinpath(args.name).joinpath('random.txt')
+        texts = [text for text in load_messages(filename) if text != '[el]#moca_null#'] or ['こんにちは']
+        contents = synthetic_messages(texts, args.count, args.seed)
+    try:
+        report = run(replay(MessageHandler(bot, server),
+                            contents,
+                            args.rate,
+                            args.concurrency,
+                            args.timeout,
+                            args.send_latency))
+    finally:
+        if server is not None:
+            server.close()
+    print_report(report)
+
+
+if __name__ == '__main__':
+    main()
+
+# -------------------------------------------------------------------------- Replay --
@@ -0,0 +1,306 @@
+# Ω*
+#               ■          ■■■■■  
+#               ■         ■■   ■■ 
+#               ■        ■■     ■ 
+#               ■        ■■       
+#     ■■■■■     ■        ■■■      
+#    ■■   ■■    ■         ■■■     
+#   ■■     ■■   ■          ■■■■   
+#   ■■     ■■   ■            ■■■■ 
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■ 
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from json import dumps, loads
+from threading import Event, Lock, Thread
+from time import monotonic
+from traceback import print_exc
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from uuid import uuid4
+from .dictionary import Dictionary
+
+try:
+    from redis import Redis
+except ImportError:
+    Redis = None
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- StudyEvent --------------------------------------------------------------------------
+
+
+class StudyEvent(NamedTuple):
+    """
+    あるインスタンスが学習した文。形態素解析の結果を含むため、受信側で解析し直す必要は無い。
+
+    プロパティ:
+    id -- イベントのID。同じイベントを二回受信しても一度しか適用しない
+    origin -- 学習したインスタンスのID
+    message -- 学習した文
+    parts -- 形態素のリスト
+    """
+    id: str
+    origin: str
+    message: str
+    parts: List[Tuple[str, str]]
+
+    def to_dict(self) -> dict:
+        return {'id': self.id, 'origin': self.origin, 'message': self.message, 'parts': self.parts}
+
+    @staticmethod
+    def from_dict(data: dict) -> 'StudyEvent':
+        return StudyEvent(data['id'], data['origin'], data['message'], [tuple(part) for part in data['parts']])
+
+# -------------------------------------------------------------------------- StudyEvent --
+
+# -- Broker --------------------------------------------------------------------------
+
+
+class Broker(metaclass=ABCMeta):
+    """学習イベントを配信するPub/Subの基底クラス。"""
+
+    @abstractmethod
+    def publish(self, channel: str, data: str) -> None:
+        """チャンネルchannelに文字列dataを配信する。"""
+        pass
+
+    @abstractmethod
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        """チャンネルchannelに配信された文字列を受け取るcallbackを登録する。"""
+        pass
+
+    def close(self) -> None:
+        """接続を終了する。"""
+        pass
+
+
+class LocalBroker(Broker):
+    """同じプロセス内でのみ配信するBroker。テストや単一プロセスでの動作確認に使用する。"""
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__subscribers: Dict[str, List[Callable[[str], None]]] = {}
+
+    def publish(self, channel: str, data: str) -> None:
+        with self.__lock:
+            subscribers = list(self.__subscribers.get(channel, ()))
+        for callback in subscribers:
+            callback(data)
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        with self.__lock:
+            self.__subscribers.setdefault(channel, []).append(callback)
+
+
+class RedisBroker(Broker):
+    """Redis(またはRedis互換のサーバー)のPub/Subで配信するBroker。redisパッケージが必要。"""
+
+    def __init__(self, url: str = 'redis://localhost:6379/0'):
+        if Redis is None:
+            raise ImportError('RedisBroker requires the redis package.')
+        self.__redis = Redis.from_url(url)
+        self.__pubsub = self.__redis.pubsub(ignore_subscribe_messages=True)
+        self.__thread = None
+
+    def publish(self, channel: str, data: str) -> None:
+        self.__redis.publish(channel, data)
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        self.__pubsub.subscribe(**{channel: lambda message: callback(message['data'].decode('utf-8'))})
+        if self.__thread is None:
+            self.__thread = self.__pubsub.run_in_thread(sleep_time=0.1, daemon=True)
+
+    def close(self) -> None:
+        if self.__thread is not None:
+            self.__thread.stop()
+        self.__pubsub.close()
+        self.__redis.close()
+
+# -------------------------------------------------------------------------- Broker --
+
+# -- Replicator --------------------------------------------------------------------------
+
+
+class Replicator(object):
+    """
+    辞書で学習した文を他のインスタンスに配信し、他のインスタンスが学習した文を辞書に適用する。
+    送信・適用はどちらもbatch_size件またはflush_interval秒ごとにまとめて行う。
+    適用済みのイベントIDを記録し、同じイベントは一度しか適用しない。
+    同じ文は辞書の学習済み索引でも除外されるため、接続中のインスタンスは同じ文を学習した状態に収束する。
+    適用した内容は最大save_interval秒ごとに辞書ファイルへ保存し、保存した後にcallbackを呼び出す。
+
+    制限:
+    Pub/Subは接続中のインスタンスにしか配信しないため、接続していない間に他のインスタンスが学習した文は受け取れない。
+    後から起動するインスタンスは、起動前に稼働中のインスタンスのdata/<name>/を複製してから接続する。
+
+    プロパティ:
+    instance_id -- このインスタンスのID
+    applied -- 適用した他のインスタンスのイベントの数
+    published -- 配信したイベントの数
+    """
+
+    def __init__(self,
+                 dictionary: Dictionary,
+                 broker: Broker,
+                 channel: str,
+                 instance_id: Optional[str] = None,
+                 batch_size: int = 256,
+                 flush_interval: float = 1.0,
+                 seen_size: int = 100000,
+                 save_interval: float = 30.0,
+                 callback: Optional[Callable[[int], None]] = None):
+        """
+        seen_sizeは記録しておく適用済みのイベントIDの数。
+        callbackには前回の保存以降に適用したイベントの数が渡される。callbackはReplicatorのスレッドで呼び出される。
+        """
+        self.__dictionary = dictionary
+        self.__broker = broker
+        self.__channel = channel
+        self.__instance_id = instance_id or uuid4().hex
+        self.__batch_size = batch_size
+        self.__flush_interval = flush_interval
+        self.__seen_size = seen_size
+        self.__save_interval = save_interval
+        self.__callback = callback
+        self.__lock = Lock()
+        self.__outbox: List[StudyEvent] = []
+        self.__inbox: List[StudyEvent] = []
+        self.__seen: OrderedDict = OrderedDict()
+        self.__applied = 0
+        self.__published = 0
+        self.__unsaved = 0
+        self.__saved_at = monotonic()
+        self.__stopped = Event()
+        self.__thread: Optional[Thread] = None
+        dictionary.add_listener(self.__on_study)
+        broker.subscribe(channel, self.__on_receive)
+
+    def start(self) -> None:
+        """flush_interval秒ごとに送信・適用を行うスレッドを開始する。"""
+        if self.__thread is None:
+            self.__thread = Thread(target=self.__run, name='Replicator', daemon=True)
+            self.__thread.start()
+
+    def flush(self) -> None:
+        """
+        たまっているイベントを送信し、受信したイベントを辞書に適用する。
+        送信に失敗した場合もイベントは残り、次のflush()で再送する。
+        """
+        try:
+            self.__send()
+        finally:
+            self.__apply()
+
+    def close(self) -> None:
+        """スレッドを終了し、残っているイベントを処理・保存してからBrokerとの接続を終了する。"""
+        self.__stopped.set()
+        if self.__thread is not None:
+            self.__thread.join()
+        self.flush()
+        self.__save(force=True)
+        self.__broker.close()
+
+    def __run(self) -> None:
+        while not self.__stopped.wait(self.__flush_interval):
+            try:
+                self.flush()
+                self.__save()
+            except Exception:
+                print_exc()
+
+    def __on_study(self, message: str, parts: List[Tuple[str, str]]) -> None:
+        """辞書で新しい文を学習したときに呼び出され、送信するイベントをためる。"""
+        event = StudyEvent(uuid4().hex, self.__instance_id, message, list(parts))
+        with self.__lock:
+            self.__outbox.append(event)
+            full = len(self.__outbox) >= self.__batch_size
+        if full:
+            # 学習した側の処理を止めないように、送信の失敗はここでは記録だけ行う
+            try:
+                self.__send()
+            except Exception:
+                print_exc()
+
+    def __on_receive(self, data: str) -> None:
+        """
+        Brokerからイベントのリストを受信し、適用するイベントをためる。
+        読み込めないデータは無視する (例外を送出するとBrokerの受信スレッドが止まるため)。
+        """
+        try:
+            events = [StudyEvent.from_dict(item) for item in loads(data)]
+        except Exception:
+            print_exc()
+            return
+        with self.__lock:
+            for event in events:
+                if event.origin == self.__instance_id or event.id in self.__seen:
+                    continue
+                self.__seen[event.id] = None
+                if len(self.__seen) > self.__seen_size:
+                    self.__seen.popitem(last=False)
+                self.__inbox.append(event)
+            full = len(self.__inbox) >= self.__batch_size
+        if full:
+            self.__apply()
+
+    def __send(self) -> None:
+        with self.__lock:
+            outbox, self.__outbox = self.__outbox, []
+        if outbox:
+            try:
+                self.__broker.publish(self.__channel, dumps([event.to_dict() for event in outbox], ensure_ascii=False))
+            except Exception:
+                # 送信できなかったイベントは先頭に戻し、次の送信で再送する (受信側はイベントIDで重複を除外する)
+                with self.__lock:
+                    self.__outbox[:0] = outbox
+                raise
+            self.__published += len(outbox)
+
+    def __apply(self) -> None:
+        with self.__lock:
+            inbox, self.__inbox = self.__inbox, []
+        if inbox:
+            # 受信したイベントは再配信しない
+            for event in inbox:
+                self.__dictionary.study(event.message, event.parts, notify=False)
+            self.__dictionary.commit()
+            with self.__lock:
+                self.__applied += len(inbox)
+                self.__unsaved += len(inbox)
+
+    def __save(self, force: bool = False) -> None:
+        """前回の保存からsave_interval秒経過していれば、適用した内容を保存してcallbackを呼び出す。"""
+        with self.__lock:
+            if self.__unsaved == 0 or (not force and monotonic() - self.__saved_at < self.__save_interval):
+                return
+            count, self.__unsaved = self.__unsaved, 0
+            self.__saved_at = monotonic()
+        self.__dictionary.save()
+        if self.__callback is not None:
+            self.__callback(count)
+
+    @property
+    def instance_id(self) -> str:
+        """このインスタンスのID"""
+        return self.__instance_id
+
+    @property
+    def applied(self) -> int:
+        """適用した他のインスタンスのイベントの数"""
+        return self.__applied
+
+    @property
+    def published(self) -> int:
+        """配信したイベントの数"""
+        return self.__published
+
+# -------------------------------------------------------------------------- Replicator --
@@ -22,7 +22,7 @@ from random import choice
 from .morph import is_keyword
 from re import search
 from typing import List, Tuple, Optional
-from .dictionary import Dictionary
+from .dictionary import Dictionary, DictionarySnapshot
 
 # -------------------------------------------------------------------------- Imports --
 
@@ -34,7 +34,7 @@ class Responder(metaclass=ABCMeta):
     AIの応答を制御する思考エンジンの基底クラス。
 
     メソッド:
-    response(str) -- ユーザーの入力strを受け取り、思考結果を返す
+    response(str, parts, snapshot) -- ユーザーの入力strを受け取り、辞書snapshotを使った思考結果を返す
 
     プロパティ:
     name -- Responderオブジェクトの名前
@@ -51,6 +51,14 @@ class Responder(metaclass=ABCMeta):
         """文字列を受け取り、思考した結果を返す"""
         pass
 
+    def _snapshot(self, snapshot: Optional[DictionarySnapshot]) -> DictionarySnapshot:
+        """
+        応答に使う辞書を返す。
+        MocaBot.dialogue()から一回の応答で同じ辞書snapshotが渡されるため、途中で学習・読み込み直しがあっても辞書が混ざらない。
+        snapshotが省略された場合は公開中の辞書を使う。
+        """
+        return self._dictionary.snapshot if snapshot is None else snapshot
+
     @property
     def name(self) -> str:
         """思考エンジンの名前"""
@@ -67,11 +75,15 @@ class RandomResponder(Responder):
     登録された文字列からランダムなものを返す。
     """
 
-    def response(self, *args) -> Optional[str]:
+    def response(self,
+                 message: Optional[str] = None,
+                 parts: Optional[List[Tuple[str, str]]] = None,
+                 snapshot: Optional[DictionarySnapshot] = None) -> Optional[str]:
         """ユーザーからの入力は受け取るが、使用せずにランダムな応答を返す。"""
+        random = self._snapshot(snapshot).random
         count = 0
         while True:
-            response = choice(self._dictionary.random)
+            response = choice(random)
             if response != '[el]#moca_null#':
                 return response
             else:
@@ -90,10 +102,10 @@ class PatternResponder(Responder):
     登録されたパターンに反応し、関連する応答を返す。
     """
 
-    def response(self, message: str, _) -> Optional[str]:
+    def response(self, message: str, _, snapshot: Optional[DictionarySnapshot] = None) -> Optional[str]:
         """ユーザーの入力に合致するパターンがあれば、関連するフレーズを返す。"""
         try:
-            for pattern in self._dictionary.pattern:
+            for pattern in self._snapshot(snapshot).pattern:
                 matcher = search(pattern['pattern'], message)
                 if matcher:
                     chosen_response = choice(pattern['phrases'])
@@ -108,14 +120,18 @@ class PatternResponder(Responder):
 
 
 class TemplateResponder(Responder):
-    def response(self, _, parts: List[Tuple[str, str]]) -> Optional[str]:
+    def response(self,
+                 _,
+                 parts: List[Tuple[str, str]],
+                 snapshot: Optional[DictionarySnapshot] = None) -> Optional[str]:
         """形態素解析結果partsに基づいてテンプレートを選択・生成して返す。"""
         try:
             keywords = [word for word, part in parts if is_keyword(part)]
             count = len(keywords)
+            templates = self._snapshot(snapshot).template
             if count > 0:
-                if count in self._dictionary.template:
-                    template = choice(self._dictionary.template[count])
+                if count in templates:
+                    template = choice(templates[count])
                     for keyword in keywords:
                         template = template.replace('%noun%', keyword, 1)
                     return template
@@ -129,14 +145,17 @@ class TemplateResponder(Responder):
 
 
 class MarkovResponder(Responder):
-    def response(self, _, parts: List[Tuple[str, str]]) -> Optional[str]:
+    def response(self,
+                 _,
+                 parts: List[Tuple[str, str]],
+                 snapshot: Optional[DictionarySnapshot] = None) -> Optional[str]:
         """
         形態素のリストpartsからキーワードを選択し、それに基づく文章を生成して返す。
         キーワードに該当するものがなかった場合はランダム辞書から返す。
         """
         try:
             keyword = next((w for w, p in parts if is_keyword(p)), '')
-            response = self._dictionary.markov.generate(keyword)
+            response = self._snapshot(snapshot).markov.generate(keyword)
             return response
         except Exception:
             return None
@@ -147,10 +166,10 @@ class MarkovResponder(Responder):
 
 
 class SpecialResponder(Responder):
-    def response(self, message: str, _) -> Optional[str]:
+    def response(self, message: str, _, snapshot: Optional[DictionarySnapshot] = None) -> Optional[str]:
         """固定返事があれば返答する。"""
         try:
-            return self._dictionary.special.get(message, None)
+            return self._snapshot(snapshot).special.get(message, None)
         except Exception:
             return None
 
@@ -160,12 +179,13 @@ class SpecialResponder(Responder):
 
 
 class KeywordResponder(Responder):
-    def response(self, message: str, _) -> Optional[str]:
+    def response(self, message: str, _, snapshot: Optional[DictionarySnapshot] = None) -> Optional[str]:
         """キーワードを含んでいれば返答する。"""
         try:
-            for key in self._dictionary.keyword:
+            keywords = self._snapshot(snapshot).keyword
+            for key in keywords:
                 if key in message:
-                    return self._dictionary.keyword.get(key, None)
+                    return keywords.get(key, None)
             return None
         except Exception:
             return None
@@ -176,10 +196,13 @@ class KeywordResponder(Responder):
 
 
 class UserRandomResponder(Responder):
-    def response(self, *args) -> Optional[str]:
+    def response(self,
+                 message: Optional[str] = None,
+                 parts: Optional[List[Tuple[str, str]]] = None,
+                 snapshot: Optional[DictionarySnapshot] = None) -> Optional[str]:
         """ユーザー定義のランダム返答をする"""
         try:
-            return choice(self._dictionary.user_random)
+            return choice(self._snapshot(snapshot).user_random)
         except Exception:
             return None
 
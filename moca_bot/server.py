@@ -0,0 +1,143 @@
+# Ω*
+#               ■          ■■■■■  
+#               ■         ■■   ■■ 
+#               ■        ■■     ■ 
+#               ■        ■■       
+#     ■■■■■     ■        ■■■      
+#    ■■   ■■    ■         ■■■     
+#   ■■     ■■   ■          ■■■■   
+#   ■■     ■■   ■            ■■■■ 
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■ 
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from asyncio import wrap_future
+from concurrent.futures import Future, ProcessPoolExecutor
+from gc import collect, freeze, unfreeze
+from multiprocessing import get_context
+from os import cpu_count
+from threading import Lock
+from typing import Iterable, Optional, Tuple, Union
+from .MocaBot import MocaBot
+from .morph import get_backend
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- Variables --------------------------------------------------------------------------
+
+# ワーカープロセスが応答に使用する人工無脳 (fork時に親プロセスから引き継ぐ)
+SHARED_BOT: Optional[MocaBot] = None
+
+# -------------------------------------------------------------------------- Variables --
+
+# -- Worker Functions --------------------------------------------------------------------------
+
+
+def _dialogue(message: str) -> Tuple[str, str]:
+    """ワーカープロセスで応答を生成し、(応答, Responderの名前)を返す。"""
+    response = SHARED_BOT.dialogue(message)
+    return response, SHARED_BOT.responder_name
+
+
+def _ready(_) -> None:
+    """ワーカープロセスを起動させるための空の処理。"""
+    return None
+
+# -------------------------------------------------------------------------- Worker Functions --
+
+# -- DialogueServer --------------------------------------------------------------------------
+
+
+class DialogueServer(object):
+    """
+    複数のワーカープロセスで応答を生成する。
+    ワーカープロセスは親プロセスで読み込んだ辞書をforkで引き継ぎ、読み取り専用で使用する。
+    fork直後は辞書のページを親プロセスと共有するが、参照カウントの更新で触れたページはコピーされるため、
+    共有が続く割合は応答で参照する範囲に依存する (RSSは計測していない)。
+    学習は親プロセスのみで行い、publish()で新しい辞書を使うワーカープロセスに入れ替える。
+    publish()はforkを行うため、executorのスレッドではなくイベントループ(メインスレッド)から呼び出す。
+
+    プロパティ:
+    workers -- ワーカープロセスの数
+    version -- 公開した辞書の版
+    """
+
+    def __init__(self, bot: MocaBot, workers: int = 0):
+        """
+        学習済みの人工無脳botを受け取り、workers個のワーカープロセスを起動する。
+        workersが0以下の場合はCPUのコア数とする。
+        """
+        self.__bot = bot
+        self.__workers = workers if workers > 0 else cpu_count() or 1
+        self.__context = get_context('fork')
+        self.__lock = Lock()
+        self.__version = 0
+        self.__executor = self.__start()
+
+    def submit(self, message: str) -> Future:
+        """メッセージmessageへの応答をワーカープロセスに依頼し、(応答, Responderの名前)のFutureを返す。"""
+        return self.__executor.submit(_dialogue, message)
+
+    async def dialogue(self, message: str) -> Tuple[str, str]:
+        """メッセージmessageへの応答をワーカープロセスで生成し、(応答, Responderの名前)を返す。"""
+        return await wrap_future(self.submit(message))
+
+    def study(self, message: Union[str, Iterable[str]]) -> None:
+        """親プロセスの辞書にメッセージを学習させる。ワーカープロセスへの反映はpublish()で行う。"""
+        with self.__lock:
+            self.__bot.study(message)
+
+    def publish(self, save: bool = True) -> None:
+        """
+        学習した内容を反映したワーカープロセスを起動し、古いワーカープロセスと入れ替える。
+        古いワーカープロセスは処理中の応答を返してから終了する。
+        saveがTrueの場合は辞書をファイルにも保存する。
+        """
+        with self.__lock:
+            if save:
+                self.__bot.save()
+            old = self.__executor
+            self.__executor = self.__start()
+            self.__version += 1
+        old.shutdown(wait=False)
+
+    def close(self) -> None:
+        """ワーカープロセスを終了する。"""
+        self.__executor.shutdown(wait=True)
+
+    def __start(self) -> ProcessPoolExecutor:
+        """現在の辞書を引き継いだワーカープロセスを起動する。"""
+        global SHARED_BOT
+        SHARED_BOT = self.__bot
+        # 形態素解析器は最初に使用するときに作成されるため、fork前に作成して全プロセスで共有する
+        get_backend()
+        # 辞書のオブジェクトをGCの対象から外し、fork後のGCによるページのコピーを防ぐ
+        # (参照カウントの更新によるコピーは防げない)
+        collect()
+        freeze()
+        try:
+            executor = ProcessPoolExecutor(self.__workers, mp_context=self.__context)
+            # すべてのワーカープロセスをここでforkさせる
+            list(executor.map(_ready, range(self.__workers)))
+        finally:
+            unfreeze()
+        return executor
+
+    @property
+    def workers(self) -> int:
+        """ワーカープロセスの数"""
+        return self.__workers
+
+    @property
+    def version(self) -> int:
+        """公開した辞書の版"""
+        return self.__version
+
+# -------------------------------------------------------------------------- DialogueServer --
@@ -0,0 +1,93 @@
+# Ω*
+#               ■          ■■■■■  
+#               ■         ■■   ■■ 
+#               ■        ■■     ■ 
+#               ■        ■■       
+#     ■■■■■     ■        ■■■      
+#    ■■   ■■    ■         ■■■     
+#   ■■     ■■   ■          ■■■■   
+#   ■■     ■■   ■            ■■■■ 
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■ 
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from argparse import ArgumentParser
+from json import dumps
+from typing import Dict, List, Optional
+from .dictionary import Dictionary
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- Report --------------------------------------------------------------------------
+
+
+def format_distribution(values: Dict[str, float]) -> str:
+    """distribution()の結果を一行の文字列にする。"""
+    return (f"min {values['min']} / mean {values['mean']:.1f} / p50 {values['p50']} / "
+            f"p90 {values['p90']} / p99 {values['p99']} / max {values['max']}")
+
+
+def format_report(stats: dict) -> str:
+    """Dictionary.stats()の結果を表示用の文字列にする。"""
+    components = stats['components']
+    markov = components['markov']
+    lines = [
+        f"辞書: {stats['name']} (版 {stats['version']}, 未公開の学習 {stats['pending']}件)",
+        f"推定メモリ使用量: {stats['bytes']:,} bytes",
+        '',
+        '辞書ごとの要素数と推定メモリ使用量 (共有しているオブジェクトはそれぞれで数える):',
+    ]
+    for name, component in components.items():
+        lines.append(f"    {name:<12} {component.get('count', markov['prefixes']):>10,}件 {component['bytes']:>14,} bytes")
+    lines += [
+        '',
+        f"ランダム辞書の文字数: {format_distribution(components['random']['length'])}",
+        f"名詞あたりのフレーズ数: {format_distribution(components['pattern']['phrases'])}",
+        '名詞の数ごとのテンプレート数: ' + ', '.join(
+            f'{count}: {templates}' for count, templates in components['template']['by_noun_count'].items()),
+        '',
+        f"マルコフ辞書: prefix1 {markov['prefix1']:,}件 / prefix {markov['prefixes']:,}組 / "
+        f"遷移 {markov['transitions']:,}件 (延べ {markov['occurrences']:,}回) / 開始点 {markov['starts']:,}件",
+        f"    prefix1あたりのprefix2の数: {format_distribution(markov['prefix2_fanout'])}",
+        f"    prefixあたりのsuffixの数: {format_distribution(markov['suffix_fanout'])}",
+        f"    prefixあたりの出現回数: {format_distribution(markov['suffix_occurrences'])}",
+        '',
+        'フレーズの多い名詞:',
+    ]
+    for item in components['pattern']['heaviest_nouns']:
+        lines.append(f"    {item['noun']}: {item['phrases']:,}件 ({item['bytes']:,} bytes)")
+    lines += ['', '遷移の多いprefix1:']
+    for item in markov['heaviest_prefixes']:
+        lines.append(f"    {item['prefix']}: prefix2 {item['prefix2']:,}件 / 遷移 {item['transitions']:,}件 "
+                     f"({item['bytes']:,} bytes)")
+    lines += ['', f"data/{stats['name']}/のファイル:"]
+    for name, size in stats['files'].items():
+        lines.append(f'    {name:<20} {size:>14,} bytes')
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = ArgumentParser(description='辞書とマルコフ辞書の大きさを集計し、容量の見積もりのためのレポートを表示する。')
+    parser.add_argument('name', nargs='?', default='shirotako', help='辞書の名前 (data/<name>/)')
+    parser.add_argument('-t', '--top', type=int, default=10, help='表示する上位の件数')
+    parser.add_argument('-j', '--json', action='store_true', help='JSONで出力する')
+    args = parser.parse_args(argv)
+
+    stats = Dictionary(args.name).stats(args.top)
+    if args.json:
+        print(dumps(stats, ensure_ascii=False, indent=4))
+    else:
+        print(format_report(stats))
+
+
+if __name__ == '__main__':
+    main()
+
+# -------------------------------------------------------------------------- Report --
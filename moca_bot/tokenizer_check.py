@@ -0,0 +1,127 @@
+# Ω*
+#               ■          ■■■■■  
+#               ■         ■■   ■■ 
+#               ■        ■■     ■ 
+#               ■        ■■       
+#     ■■■■■     ■        ■■■      
+#    ■■   ■■    ■         ■■■     
+#   ■■     ■■   ■          ■■■■   
+#   ■■     ■■   ■            ■■■■ 
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■ 
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from argparse import ArgumentParser
+from collections import Counter
+from pathlib import Path
+from sys import exit
+from time import perf_counter
+from typing import Dict, List, Optional
+from .morph import BACKENDS, TokenizerBackend, JanomeBackend, is_keyword
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- Check --------------------------------------------------------------------------
+
+
+def keywords(backend: TokenizerBackend, message: str) -> List[str]:
+    """backendで解析したmessageのうち、is_keywordがキーワードと判定する語のリストを返す。"""
+    return [word for word, part in backend.tokenize(message) if is_keyword(part)]
+
+
+def compare(reference: TokenizerBackend, backend: TokenizerBackend, messages: List[str]) -> Dict[str, float]:
+    """
+    messagesのキーワード判定をreferenceとbackendで比較する。
+    キーワードが完全に一致した文の割合と、キーワード単位の適合率・再現率・F値、不一致の例を返す。
+    """
+    matched = common = expected_total = actual_total = 0
+    mismatches = []
+    for message in messages:
+        expected = keywords(reference, message)
+        actual = keywords(backend, message)
+        if expected == actual:
+            matched += 1
+        elif len(mismatches) < 5:
+            mismatches.append((message, expected, actual))
+        common += sum((Counter(expected) & Counter(actual)).values())
+        expected_total += len(expected)
+        actual_total += len(actual)
+    precision = common / actual_total if actual_total else 1.0
+    recall = common / expected_total if expected_total else 1.0
+    return {
+        'sentences': matched / len(messages) if messages else 1.0,
+        'precision': precision,
+        'recall': recall,
+        'f1': 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        'mismatches': mismatches,
+    }
+
+
+def benchmark(backend: TokenizerBackend, messages: List[str], repeat: int = 3) -> Dict[str, float]:
+    """messagesをrepeat回解析し、最も速かった回の一秒あたりの形態素数と文数を返す。"""
+    best = None
+    tokens = 0
+    for _ in range(repeat):
+        started = perf_counter()
+        tokens = sum(len(backend.tokenize(message)) for message in messages)
+        elapsed = perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    best = best or 1e-9
+    return {'tokens_per_second': tokens / best, 'sentences_per_second': len(messages) / best, 'tokens': tokens}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = ArgumentParser(description='形態素解析器のキーワード判定をjanomeと比較し、速度を計測する。')
+    parser.add_argument('name', nargs='?', default='shirotako', help='辞書の名前 (data/<name>/random.txtの文を使用する)')
+    parser.add_argument('-f', '--file', type=Path, default=None, help='文のファイル (一行一文)')
+    parser.add_argument('-b', '--backend', action='append', choices=sorted(BACKENDS), default=None,
+                        help='比較する形態素解析器 (省略時はインストールされているすべて)')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='速度を計測する回数')
+    parser.add_argument('--min-f1', type=float, default=0.9, help='キーワード判定のF値がこれ未満であれば失敗とする')
+    args = parser.parse_args(argv)
+
+    filename = args.file
+    if filename is None:
+        filename = Path(__file__).parent.parent.joinpath('data').joinpath(args.name).joinpath('random.txt')
+    with open(str(filename), mode='r', encoding='utf-8') as file:
+        messages = [line for line in file.read().splitlines() if line and line != '[el]#moca_null#']
+
+    reference = JanomeBackend()
+    backends = [reference]
+    for name in args.backend or sorted(BACKENDS):
+        if name == JanomeBackend.NAME:
+            continue
+        try:
+            backends.append(BACKENDS[name]())
+        except ImportError:
+            print(f'{name}: インストールされていないため省略します。')
+
+    failed = False
+    print(f'{len(messages)}件の文で比較します。')
+    for backend in backends:
+        speed = benchmark(backend, messages, args.repeat)
+        print(f"{backend.NAME}: {speed['tokens_per_second']:,.0f}形態素/秒, {speed['sentences_per_second']:,.0f}文/秒")
+        if backend is reference:
+            continue
+        result = compare(reference, backend, messages)
+        print(f"    キーワード判定: 文の一致率 {result['sentences'] * 100:.1f}% / 適合率 {result['precision'] * 100:.1f}% / "
+              f"再現率 {result['recall'] * 100:.1f}% / F値 {result['f1'] * 100:.1f}%")
+        for message, expected, actual in result['mismatches']:
+            print(f'    {message}\n        janome: {expected}\n        {backend.NAME}: {actual}')
+        if result['f1'] < args.min_f1:
+            failed = True
+            print(f'    F値が{args.min_f1 * 100:.1f}%未満です。')
+    exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
+
+# -------------------------------------------------------------------------- Check --
@@ -0,0 +1,104 @@
+# Ω*
+#               ■          ■■■■■  
+#               ■         ■■   ■■ 
+#               ■        ■■     ■ 
+#               ■        ■■       
+#     ■■■■■     ■        ■■■      
+#    ■■   ■■    ■         ■■■     
+#   ■■     ■■   ■          ■■■■   
+#   ■■     ■■   ■            ■■■■ 
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■ 
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from asyncio import get_event_loop, sleep
+from traceback import print_exc
+from typing import Callable, List, Optional
+from .dictionary import Dictionary
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- DictionaryWatcher --------------------------------------------------------------------------
+
+
+class DictionaryWatcher(object):
+    """
+    辞書ファイルの更新時刻を定期的に確認し、更新された辞書だけを読み込み直す。
+
+    プロパティ:
+    interval -- 更新を確認する間隔(秒)
+    running -- 監視中であるかどうか
+    """
+
+    def __init__(self,
+                 dictionary: Dictionary,
+                 interval: float = 5.0,
+                 print_log: bool = False,
+                 callback: Optional[Callable[[List[str]], None]] = None):
+        """
+        callbackを指定した場合、読み込み直した後に読み込み直した辞書の種類のリストを渡して呼び出す。
+        run()で監視している場合、callbackはイベントループのスレッドで呼び出される。
+        """
+        self.__dictionary = dictionary
+        self.__interval = interval
+        self.__print_log = print_log
+        self.__callback = callback
+        self.__running = False
+
+    def check(self) -> List[str]:
+        """更新された辞書を読み込み直し、その種類のリストを返す。"""
+        changed = self.__dictionary.changed()
+        for component in changed:
+            self.__reload(component)
+        if changed and self.__callback is not None:
+            self.__callback(changed)
+        return changed
+
+    async def run(self) -> None:
+        """
+        stop()が呼ばれるまで、interval秒ごとに辞書を確認する。
+        ファイルの確認と読み込みはイベントループの外で行い、callbackはイベントループのスレッドで呼び出す。
+        (DialogueServer.publish()のようにforkする処理を、executorのスレッドから実行しないため)
+        """
+        if self.__running:
+            return
+        loop = get_event_loop()
+        self.__running = True
+        while self.__running:
+            await sleep(self.__interval)
+            try:
+                changed = await loop.run_in_executor(None, self.__dictionary.changed)
+                for component in changed:
+                    await loop.run_in_executor(None, self.__reload, component)
+                if changed and self.__callback is not None:
+                    self.__callback(changed)
+            except Exception:
+                print_exc()
+
+    def stop(self) -> None:
+        """監視を終了する。"""
+        self.__running = False
+
+    def __reload(self, component: str) -> None:
+        self.__dictionary.reload(component)
+        if self.__print_log:
+            print(f'辞書を読み込み直しました: {component}')
+
+    @property
+    def interval(self) -> float:
+        """更新を確認する間隔(秒)"""
+        return self.__interval
+
+    @property
+    def running(self) -> bool:
+        """監視中であるかどうか"""
+        return self.__running
+
+# -------------------------------------------------------------------------- DictionaryWatcher --
@@ -21,6 +21,10 @@ import discord
 from moca_config import MocaConfig
 from pathlib import Path
 from moca_bot import MocaBot
+from moca_bot.morph import backend_name, set_backend
+from moca_bot.handler import MessageHandler
+from moca_bot.server import DialogueServer
+from moca_bot.replication import RedisBroker
 
 # -------------------------------------------------------------------------- Imports --
 
@@ -34,18 +38,56 @@ debug = bot_config.get('debug', bool, False)
 
 show_responder = bot_config.get('show_responder', bool, False)
 
+dictionary_reload_interval = bot_config.get('dictionary_reload_interval', float, 5.0)
+
+dialogue_workers = bot_config.get('dialogue_workers', int, 0)
+
+admin_ids = bot_config.get('admin_ids', list, [])
+
+replication_url = bot_config.get('replication_url', str, '')
+
+tokenizer = bot_config.get('tokenizer', str, '')
+
 client = discord.Client()
 
+# 環境変数MOCA_BOT_TOKENIZER、bot_config.jsonのtokenizer、janomeの順に優先する
+set_backend(backend_name(tokenizer))
+
 shirotako_bot = MocaBot('shirotako')
 
+dialogue_server = None
+
 # -------------------------------------------------------------------------- Variables --
 
 # -- Setup Bot --------------------------------------------------------------------------
 
+
+def on_replicated(_):
+    # 他のインスタンスから受け取った学習内容は保存済みのため、イベントループのスレッドでワーカープロセスに反映する
+    if dialogue_server is not None:
+        client.loop.call_soon_threadsafe(dialogue_server.publish, False)
+
+
+# 他のインスタンスと学習内容を共有する場合は、学習を始める前に接続する
+# 接続していない間に他のインスタンスが学習した文は届かないため、新しいインスタンスは稼働中のdata/shirotako/を複製してから起動する
+replicator = shirotako_bot.replicate(RedisBroker(replication_url), callback=on_replicated) if replication_url else None
+
 for data_file in Path(__file__).parent.joinpath('twitter_data').iterdir():
     if data_file.is_file():
         shirotako_bot.study_from_file(data_file, True)
 
+# 学習が終わってからワーカープロセスを起動し、辞書をワーカープロセスと共有する
+dialogue_server = DialogueServer(shirotako_bot, dialogue_workers) if dialogue_workers > 0 else None
+
+message_handler = MessageHandler(shirotako_bot, dialogue_server, show_responder, debug, admin_ids)
+
+# 辞書を読み込み直したら、ワーカープロセスを新しい辞書で起動し直す (イベントループのスレッドで実行される)
+dictionary_watcher = shirotako_bot.watcher(
+    dictionary_reload_interval,
+    debug,
+    None if dialogue_server is None else lambda _: dialogue_server.publish(save=False)
+)
+
 # -------------------------------------------------------------------------- Setup Bot --
 
 # -- Main --------------------------------------------------------------------------
@@ -54,40 +96,15 @@ for data_file in Path(__file__).parent.joinpath('twitter_data').iterdir():
 @client.event
 async def on_ready():
     print('しろたこちゃんDiscordボット、バージョン0.0.1起動しました。')
+    # on_readyは再接続時にも呼ばれるため、監視は一度だけ開始する
+    if dictionary_reload_interval > 0 and not dictionary_watcher.running:
+        client.loop.create_task(dictionary_watcher.run())
 
 
 @client.event
 async def on_message(message):
     try:
-        if message.author.bot:
-            return None
-        elif message.content.startswith('#mendako#'):
-            response = shirotako_bot.dialogue(message.content[9:])
-            if show_responder:
-                await message.channel.send(f'{shirotako_bot.responder_name}: {response}')
-            else:
-                await message.channel.send(response)
-            if debug:
-                print(f'メッセージ受信: {message.content[9:]}')
-                print(f'返事: {response}')
-        elif message.content.startswith('#shirotako#'):
-            response = shirotako_bot.dialogue(message.content[11:])
-            if show_responder:
-                await message.channel.send(f'{shirotako_bot.responder_name}: {response}')
-            else:
-                await message.channel.send(response)
-            if debug:
-                print(f'メッセージ受信: {message.content[9:]}')
-                print(f'返事: {response}')
-        elif client.user in message.mentions:
-            response = shirotako_bot.dialogue(message.content[message.content.find('>') + 1:])
-            if show_responder:
-                await message.channel.send(f'{message.author.mention} {shirotako_bot.responder_name}: {response}')
-            else:
-                await message.channel.send(f'{message.author.mention} {response}')
-            if debug:
-                print(f'メンション受信: {message.content.find(">") + 1:]}')
-                print(f'返事: {response}')
+        await message_handler.handle(message, client.user)
     except Exception:
         pass
 
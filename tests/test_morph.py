@@ -0,0 +1,93 @@
+# Ω*
+#               ■          ■■■■■  
+#               ■         ■■   ■■ 
+#               ■        ■■     ■ 
+#               ■        ■■       
+#     ■■■■■     ■        ■■■      
+#    ■■   ■■    ■         ■■■     
+#   ■■     ■■   ■          ■■■■   
+#   ■■     ■■   ■            ■■■■ 
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■ 
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from unittest import TestCase, main, skipIf
+from typing import List
+from moca_bot.morph import JanomeBackend, MeCabBackend, TokenizerBackend, is_keyword
+
+try:
+    MECAB = MeCabBackend()
+except (ImportError, RuntimeError):
+    # mecab-python3が無い場合、または辞書が見つからない場合
+    MECAB = None
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- Variables --------------------------------------------------------------------------
+
+# is_keywordの判定がjanomeと一致しなければならない文
+SENTENCES = [
+    '猫と散歩するのが好きです。',
+    '明日は東京で会議があります。',
+    'おはよう ございます',
+    'ありがとうございます…！',
+    'グランブルーファンタジー…知ってる……',
+    'おねえちゃんの…ちゃんねる？にあがるの………',
+    '今日は…おやすみの日………',
+    '投稿を快く許可してくれためこまま…ありがとう…………っ',
+    '感想は嬉しいけれど…その………ねたばれ？というか…まだ見てない方もいると思うから……たくさんは言っちゃだめ………',
+    '臣民さんとたくさん話せて楽しかった…またいずれ遊ぼうね………っおねえちゃん、ありがとう…っ！',
+    'ゆっくり、がんばります………っ',
+    '大丈夫、です…っ！',
+]
+
+# 判定が一致しないことが分かっている文と、janomeのキーワード、理由
+KNOWN_DIVERGENCES = {
+    'わっ……？！？！？！': (['？！？！？！'], 'janomeは全角記号の連続を未知語(名詞,サ変接続)とするが、MeCabは記号とする'),
+}
+
+# -------------------------------------------------------------------------- Variables --
+
+# -- Tests --------------------------------------------------------------------------
+
+
+def keywords(backend: TokenizerBackend, message: str) -> List[str]:
+    return [word for word, part in backend.tokenize(message) if is_keyword(part)]
+
+
+class KeywordCompatibilityTest(TestCase):
+    """形態素解析器ごとのis_keywordの判定がjanomeと一致することを確認する。"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.janome = JanomeBackend()
+
+    def test_known_divergences_janome(self):
+        for message, (expected, _) in KNOWN_DIVERGENCES.items():
+            with self.subTest(message=message):
+                self.assertEqual(keywords(self.janome, message), expected)
+
+    @skipIf(MECAB is None, 'MeCab is not installed.')
+    def test_mecab(self):
+        for message in SENTENCES:
+            with self.subTest(message=message):
+                self.assertEqual(keywords(MECAB, message), keywords(self.janome, message))
+
+    @skipIf(MECAB is None, 'MeCab is not installed.')
+    def test_mecab_known_divergences(self):
+        # 一致するようになった文はKNOWN_DIVERGENCESからSENTENCESに移す
+        for message, (expected, reason) in KNOWN_DIVERGENCES.items():
+            with self.subTest(message=message, reason=reason):
+                self.assertNotEqual(keywords(MECAB, message), expected)
+
+
+if __name__ == '__main__':
+    main()
+
+# -------------------------------------------------------------------------- Tests --